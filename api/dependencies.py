@@ -1,39 +1,96 @@
 from __future__ import annotations
 
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from shared.db import AsyncSessionFactory, get_sync_session
+from shared.config import get_settings
+from shared.db import AsyncSessionFactory
 from shared.models import PipelineRun, User
-from shared.security import get_user_by_token
+from shared.security import (
+    TokenUserCache,
+    get_user_by_token,
+    get_user_by_token_id,
+    verify_session_token,
+)
 
 http_bearer = HTTPBearer(auto_error=False)
 
+settings = get_settings()
+token_cache = TokenUserCache(
+    maxsize=settings.token_cache_max_entries,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
+
 
 async def get_db() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionFactory() as session:
         yield session
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+    session: AsyncSession = Depends(get_db),
 ) -> User:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing credentials")
     token = credentials.credentials
-    with get_sync_session() as session:
-        user = get_user_by_token(session, token)
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return user
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    claims = verify_session_token(token)
+    if claims is not None:
+        # The signature already vouches for the ids, so a primary-key lookup
+        # is enough to refuse deleted sessions and users.
+        token_id, user_id = claims
+        user = await get_user_by_token_id(session, token_id, user_id)
+    else:
+        user = await get_user_by_token(session, token)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    token_cache.set(token, user)
+    return user
 
 
-async def get_run(run_id: UUID, session: AsyncSession = Depends(get_db)) -> PipelineRun:
-    run = await session.get(PipelineRun, run_id)
+async def _get_owned_run(
+    session: AsyncSession, run_id: UUID, owner: User, *options: Any
+) -> PipelineRun:
+    result = await session.execute(
+        select(PipelineRun)
+        .options(*options)
+        .where(PipelineRun.id == run_id, PipelineRun.owner_id == owner.id)
+    )
+    run = result.scalar_one_or_none()
     if not run:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
     return run
+
+
+async def get_run(
+    run_id: UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> PipelineRun:
+    """Resolve a run owned by the caller; other users' runs look missing.
+
+    Stages are left unloaded; routes that read them use ``get_run_with_stages``.
+    """
+
+    return await _get_owned_run(session, run_id, current_user)
+
+
+async def get_run_with_stages(
+    run_id: UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> PipelineRun:
+    """Like ``get_run``, with the run's stages eager-loaded in pipeline order."""
+
+    return await _get_owned_run(
+        session, run_id, current_user, selectinload(PipelineRun.stages)
+    )
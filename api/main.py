@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from shared.config import settings_dict
 from shared.pipeline import PIPELINE_ORDER
@@ -26,6 +27,7 @@ app = FastAPI(
     title="Andronoma Platform API",
     description=description,
     version="0.1.0",
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {"name": "auth", "description": "Authentication"},
         {"name": "runs", "description": "Pipeline orchestration"},
@@ -42,8 +44,10 @@ app.add_middleware(
 )
 
 app.include_router(auth.router)
-app.include_router(runs.router)
+# Both routers live under /runs without overlapping paths; logs goes first so
+# the hot stream/history routes are matched before the catch-all /runs/{run_id}.
 app.include_router(logs.router)
+app.include_router(runs.router)
 
 
 @app.get("/health", tags=["meta"])
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.db import get_sync_session
-from shared.models import User
+from shared.models import SessionToken, User
 from shared.security import create_session_token, hash_password, verify_password
 
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_db, http_bearer, token_cache
 from ..schemas.auth import LoginRequest, LoginResponse, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -40,3 +43,21 @@ def login_user(payload: LoginRequest) -> LoginResponse:
 @router.get("/me", response_model=UserResponse)
 def get_me(current_user: User = Depends(get_current_user)) -> UserResponse:
     return UserResponse(id=str(current_user.id), email=current_user.email)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> Response:
+    token = credentials.credentials
+    await session.execute(
+        delete(SessionToken).where(
+            SessionToken.token == token, SessionToken.user_id == current_user.id
+        )
+    )
+    await session.commit()
+    # Drop the cached lookup too, or the token would outlive its row until TTL.
+    token_cache.evict(token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
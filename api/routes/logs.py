@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import uuid
+from typing import Any, AsyncIterator, Dict
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,30 +13,67 @@ from sse_starlette.sse import EventSourceResponse
 from shared.logs import broker
 from shared.models import PipelineRun, RunLog
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import get_db, get_run
 from ..schemas.logs import RunLogEntry, RunLogListResponse
 
 router = APIRouter(prefix="/runs", tags=["logs"])
 
+# Keep reverse proxies (nginx in particular) from buffering or caching the stream.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_PING_SECONDS = 15
+# Events buffered per connection before the oldest ones are dropped for slow clients.
+SSE_BUFFER_SIZE = 1000
+
+
+# Queued once the producer stops; compared by identity, never sent.
+_STREAM_CLOSED: Dict[str, Any] = {}
+
+
+async def _sse_frames(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Frame ``events`` for SSE, reading them ahead into a bounded buffer."""
+
+    buffer: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=SSE_BUFFER_SIZE)
+
+    def push(event: Dict[str, Any]) -> None:
+        if buffer.full():
+            buffer.get_nowait()
+        buffer.put_nowait(event)
+
+    async def fill_buffer() -> None:
+        async for event in events:
+            push(event)
+
+    producer = asyncio.create_task(fill_buffer())
+    # Wake the consumer whenever the producer stops, so a failure is raised
+    # here instead of leaving the connection idling on keep-alive pings.
+    producer.add_done_callback(lambda _task: push(_STREAM_CLOSED))
+    try:
+        while True:
+            event = await buffer.get()
+            if event is _STREAM_CLOSED:
+                producer.result()
+                return
+            # EventSourceResponse passes bytes through untouched, so frame
+            # the event ourselves. orjson escapes newlines inside the data.
+            level = str(event.get("level", "info")).encode()
+            yield b"".join(
+                (
+                    b"event: ",
+                    level,
+                    b"\r\ndata: ",
+                    orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS),
+                    b"\r\n\r\n",
+                )
+            )
+    finally:
+        producer.cancel()
 
-@router.get("/{run_id}/logs/stream")
-async def stream_logs(
-    run_id: uuid.UUID,
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_db),
-):
-    run = await session.get(PipelineRun, run_id)
-    if not run or run.owner_id != user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-
-    async def event_generator():
-        async for event in broker.stream(run_id):
-            yield {
-                "event": event.get("level", "info"),
-                "data": json.dumps(event),
-            }
 
-    return EventSourceResponse(event_generator())
+@router.get("/{run_id}/logs/stream")
+async def stream_logs(run: PipelineRun = Depends(get_run)):
+    return EventSourceResponse(
+        _sse_frames(broker.stream(run.id)), ping=SSE_PING_SECONDS, headers=SSE_HEADERS
+    )
 
 
 @router.get("/{run_id}/logs", response_model=RunLogListResponse)
@@ -42,13 +81,9 @@ async def list_logs(
     run_id: uuid.UUID,
     limit: int = Query(100, ge=1, le=500),
     after: uuid.UUID | None = Query(None),
-    user=Depends(get_current_user),
     session: AsyncSession = Depends(get_db),
+    run: PipelineRun = Depends(get_run),
 ):
-    run = await session.get(PipelineRun, run_id)
-    if not run or run.owner_id != user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-
     query = select(RunLog).where(RunLog.run_id == run_id)
 
     if after is not None:
@@ -1,26 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from shared.db import get_sync_session
 from shared.models import (
     AssetRecord,
     PipelineRun,
     RunStatus,
-    StageState,
     StageStatus,
     User,
     default_budgets,
 )
-from shared.pipeline import PIPELINE_ORDER
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import get_current_user, get_db, get_run, get_run_with_stages
 from ..schemas.assets import AssetListResponse, AssetRecordResponse
 from ..schemas.runs import (
     RunBudgetUpdateRequest,
@@ -31,6 +30,7 @@ from ..schemas.runs import (
     StageUpdateRequest,
 )
 from ..services.pipeline import enqueue_pipeline, ensure_stage_records
+from ..utils.pagination import decode_cursor, encode_cursor
 
 
 def _ensure_utc(dt: datetime | None) -> datetime | None:
@@ -55,7 +55,8 @@ ALLOWED_STAGE_STATUS_TRANSITIONS: dict[StageStatus, set[StageStatus]] = {
 
 
 def serialize_run(run: PipelineRun) -> RunResponse:
-    return RunResponse(
+    # Rows loaded from the database already satisfy the schema, so skip validation.
+    return RunResponse.construct(
         id=run.id,
         status=run.status,
         input_payload=run.input_payload,
@@ -64,7 +65,7 @@ def serialize_run(run: PipelineRun) -> RunResponse:
         created_at=_ensure_utc(run.created_at),
         updated_at=_ensure_utc(run.updated_at),
         stages=[
-            StageTelemetry(
+            StageTelemetry.construct(
                 name=stage.name,
                 status=stage.status,
                 started_at=_ensure_utc(stage.started_at),
@@ -73,29 +74,43 @@ def serialize_run(run: PipelineRun) -> RunResponse:
                 budget_spent=stage.budget_spent,
                 notes=stage.notes,
             )
-            for stage in sorted(
-                run.stages,
-                key=lambda s: PIPELINE_ORDER.index(s.name) if s.name in PIPELINE_ORDER else len(PIPELINE_ORDER),
-            )
+            for stage in run.stages
         ],
     )
 
 
 @router.get("", response_model=RunListResponse)
 async def list_runs(
+    limit: int = Query(50, ge=1, le=200),
+    after: str | None = Query(None),
     session: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> RunListResponse:
-    result = await session.execute(
-        PipelineRun.__table__.select().where(PipelineRun.owner_id == current_user.id)
+) -> ORJSONResponse:
+    query = (
+        select(PipelineRun)
+        .options(selectinload(PipelineRun.stages))
+        .where(PipelineRun.owner_id == current_user.id)
+    )
+    if after is not None:
+        cursor_created_at, cursor_id = decode_cursor(after)
+        query = query.where(
+            tuple_(PipelineRun.created_at, PipelineRun.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    # Fetch one extra row so the last page is detected without a trailing empty page.
+    query = query.order_by(PipelineRun.created_at.desc(), PipelineRun.id.desc()).limit(limit + 1)
+
+    result = await session.execute(query)
+    rows = result.scalars().unique().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    # Hand orjson the plain dict directly; it encodes UUIDs, datetimes and enums
+    # natively, sparing FastAPI's jsonable_encoder pass over every nested run.
+    response = RunListResponse.construct(
+        runs=[serialize_run(run) for run in rows], next_cursor=next_cursor
     )
-    rows = result.fetchall()
-    runs = []
-    for row in rows:
-        run = await session.get(PipelineRun, row.id)
-        if run:
-            runs.append(serialize_run(run))
-    return RunListResponse(runs=runs)
+    return ORJSONResponse(response.dict())
 
 
 @router.post("", response_model=RunResponse, status_code=status.HTTP_201_CREATED)
@@ -120,81 +135,40 @@ async def create_run(
 
 @router.patch("/{run_id}/budgets", response_model=RunResponse)
 async def update_run_budgets(
-    run_id: uuid.UUID,
     payload: RunBudgetUpdateRequest,
     session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    run: PipelineRun = Depends(get_run_with_stages),
 ) -> RunResponse:
-    run = await session.get(PipelineRun, run_id)
-    if not run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    if run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-
-    now = datetime.now(UTC)
-    await session.execute(
-        PipelineRun.__table__
-        .update()
-        .where(PipelineRun.id == run_id)
-        .values(budgets=dict(payload.budgets), updated_at=now)
-    )
+    run.budgets = dict(payload.budgets)
+    run.updated_at = datetime.now(UTC)
     await session.commit()
-    session.expire_all()
-
-    result = await session.execute(
-        select(PipelineRun)
-        .options(selectinload(PipelineRun.stages))
-        .where(PipelineRun.id == run_id)
-    )
-    refreshed_run = result.scalar_one_or_none()
-    if not refreshed_run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return serialize_run(refreshed_run)
+    return serialize_run(run)
 
 
 @router.post("/{run_id}/start", response_model=RunResponse)
 async def start_run(
-    run_id: uuid.UUID,
     session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    run: PipelineRun = Depends(get_run_with_stages),
 ) -> RunResponse:
-    run = await session.get(PipelineRun, run_id)
-    if not run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    if run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     if run.status not in {RunStatus.PENDING, RunStatus.FAILED}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Run already active")
 
     run.status = RunStatus.RUNNING
     run.updated_at = datetime.now(UTC)
+    await ensure_stage_records(session, run)
     await session.commit()
-    await session.refresh(run)
 
-    with get_sync_session() as sync_session:
-        persistent_run = sync_session.get(PipelineRun, run.id)
-        if persistent_run:
-            ensure_stage_records(sync_session, persistent_run)
-            enqueue_pipeline(persistent_run)
+    # Publishing to the broker is blocking I/O; keep it off the event loop.
+    await asyncio.to_thread(enqueue_pipeline, run)
 
     return serialize_run(run)
 
 
 @router.post("/{run_id}/cancel", response_model=RunResponse)
 async def cancel_run(
-    run_id: uuid.UUID,
     session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    run: PipelineRun = Depends(get_run_with_stages),
 ) -> RunResponse:
-    run = await session.get(
-        PipelineRun,
-        run_id,
-        options=(selectinload(PipelineRun.stages),),
-    )
-    if not run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    if run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     if run.status not in {RunStatus.PENDING, RunStatus.RUNNING}:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -211,51 +185,37 @@ async def cancel_run(
             stage.finished_at = now
 
     await session.commit()
-
-    result = await session.execute(
-        select(PipelineRun)
-        .options(selectinload(PipelineRun.stages))
-        .where(PipelineRun.id == run_id)
-    )
-    refreshed_run = result.scalar_one_or_none()
-    if not refreshed_run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return serialize_run(refreshed_run)
+    return serialize_run(run)
 
 
 @router.get("/{run_id}", response_model=RunResponse)
 async def get_run_detail(
-    run_id: uuid.UUID,
-    session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> RunResponse:
-    result = await session.execute(
-        select(PipelineRun)
-        .options(selectinload(PipelineRun.stages))
-        .where(PipelineRun.id == run_id)
-    )
-    run = result.scalar_one_or_none()
-    if not run or run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return serialize_run(run)
+    run: PipelineRun = Depends(get_run_with_stages),
+) -> ORJSONResponse:
+    return ORJSONResponse(serialize_run(run).dict())
 
 
 @router.get("/{run_id}/assets", response_model=AssetListResponse)
 async def list_run_assets(
-    run_id: uuid.UUID,
+    limit: int = Query(50, ge=1, le=200),
+    after: str | None = Query(None),
     session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    run: PipelineRun = Depends(get_run),
 ) -> AssetListResponse:
-    run = await session.get(PipelineRun, run_id)
-    if not run or run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-
-    result = await session.execute(
-        select(AssetRecord)
-        .where(AssetRecord.run_id == run_id)
-        .order_by(AssetRecord.created_at.desc(), AssetRecord.id.desc())
-    )
+    query = select(AssetRecord).where(AssetRecord.run_id == run.id)
+    if after is not None:
+        cursor_created_at, cursor_id = decode_cursor(after)
+        query = query.where(
+            tuple_(AssetRecord.created_at, AssetRecord.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    query = query.order_by(AssetRecord.created_at.desc(), AssetRecord.id.desc()).limit(limit + 1)
+
+    result = await session.execute(query)
     records = result.scalars().all()
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].created_at, records[-1].id)
     assets = [
         AssetRecordResponse(
             id=record.id,
@@ -268,30 +228,21 @@ async def list_run_assets(
         )
         for record in records
     ]
-    return AssetListResponse(assets=assets)
+    return AssetListResponse(assets=assets, next_cursor=next_cursor)
 
 
 @router.patch("/{run_id}/stages/{stage_name}", response_model=StageTelemetry)
 async def update_stage(
-    run_id: uuid.UUID,
     stage_name: str,
     payload: StageUpdateRequest,
     session: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    run: PipelineRun = Depends(get_run_with_stages),
 ) -> StageTelemetry:
-    run = await session.get(PipelineRun, run_id)
-    if not run:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    if run.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-
-    result = await session.execute(
-        select(StageState).where(StageState.run_id == run.id, StageState.name == stage_name)
-    )
-    stage = result.scalar_one_or_none()
+    stage = next((s for s in run.stages if s.name == stage_name), None)
     if not stage:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stage not found")
 
+    now = datetime.now(UTC)
     updated = False
 
     if payload.notes is not None:
@@ -311,7 +262,6 @@ async def update_stage(
                     detail="Invalid status transition",
                 )
             stage.status = payload.status
-            now = datetime.now(UTC)
             if payload.status == StageStatus.RUNNING and stage.started_at is None:
                 stage.started_at = now
             if payload.status in {StageStatus.COMPLETED, StageStatus.FAILED, StageStatus.SKIPPED}:
@@ -336,17 +286,13 @@ async def update_stage(
         updated = True
 
     if updated:
-        now = datetime.now(UTC)
         run.updated_at = now
         if stage_status_changed:
-            await session.flush()
             if new_stage_status == StageStatus.FAILED:
                 run.status = RunStatus.FAILED
             else:
-                result = await session.execute(
-                    select(StageState.status).where(StageState.run_id == run.id)
-                )
-                stage_statuses = set(result.scalars().all())
+                # The run's stages were loaded with it, so aggregate in memory.
+                stage_statuses = {s.status for s in run.stages}
                 if StageStatus.RUNNING in stage_statuses:
                     run.status = RunStatus.RUNNING
                 elif stage_statuses and stage_statuses.issubset(
@@ -354,10 +300,6 @@ async def update_stage(
                 ):
                     run.status = RunStatus.COMPLETED
         await session.commit()
-        await session.refresh(stage)
-        await session.refresh(run)
-    else:
-        await session.refresh(stage)
 
     return StageTelemetry(
         name=stage.name,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -22,3 +22,4 @@ class AssetRecordResponse(BaseModel):
 
 class AssetListResponse(BaseModel):
     assets: List[AssetRecordResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -9,6 +9,8 @@ from pydantic import BaseModel, Field, validator
 from shared.models import RunStatus, StageStatus
 from shared.pipeline import PIPELINE_ORDER
 
+_ALLOWED_STAGES: frozenset[str] = frozenset(PIPELINE_ORDER)
+
 
 class PipelineConfig(BaseModel):
     name: str
@@ -27,9 +29,8 @@ class RunBudgetUpdateRequest(BaseModel):
 
     @validator("budgets")
     def validate_budgets(cls, value: Dict[str, float]) -> Dict[str, float]:
-        allowed_stages = set(PIPELINE_ORDER)
         for stage, amount in value.items():
-            if stage not in allowed_stages:
+            if stage not in _ALLOWED_STAGES:
                 raise ValueError(f"Unknown stage '{stage}'")
             if amount < 0:
                 raise ValueError("Budget allocations must be non-negative")
@@ -84,3 +85,4 @@ class RunResponse(BaseModel):
 
 class RunListResponse(BaseModel):
     runs: List[RunResponse]
+    next_cursor: Optional[str] = None
@@ -4,27 +4,42 @@ import uuid
 from typing import Dict, List
 
 from celery import chain
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models import PipelineRun, RunStatus, StageState
-from shared.pipeline import PIPELINE_ORDER
+from shared.pipeline import PIPELINE_ORDER, stage_sort_index
 
 from workers.tasks import run_stage_task
 
 
+_STAGE_NAMES = tuple(PIPELINE_ORDER)
+
+
 def enqueue_pipeline(run: PipelineRun) -> str:
     """Create a Celery workflow that processes all pipeline stages sequentially."""
 
-    signatures = [run_stage_task.s(str(run.id), stage_name) for stage_name in PIPELINE_ORDER]
-    workflow = chain(*signatures)
+    # Immutable signatures: each stage reads its inputs from the database, so
+    # the previous task's return value must not be prepended to its arguments.
+    run_id = str(run.id)
+    workflow = chain(*(run_stage_task.si(run_id, stage_name) for stage_name in _STAGE_NAMES))
     result = workflow.apply_async()
     return result.id
 
 
-def ensure_stage_records(session: Session, run: PipelineRun) -> None:
+async def ensure_stage_records(session: AsyncSession, run: PipelineRun) -> None:
+    """Attach any missing stage rows to ``run``; the caller commits."""
+
     existing_names = {stage.name for stage in run.stages}
     for stage_name in PIPELINE_ORDER:
         if stage_name not in existing_names:
-            stage = StageState(id=uuid.uuid4(), run_id=run.id, name=stage_name)
-            session.add(stage)
-    session.commit()
+            run.stages.append(
+                StageState(
+                    id=uuid.uuid4(),
+                    run_id=run.id,
+                    name=stage_name,
+                    sort_index=stage_sort_index(stage_name),
+                )
+            )
+    # Keep the in-memory collection in the relationship's order_by order.
+    run.stages.sort(key=lambda stage: (stage.sort_index, stage.name))
+    await session.flush()
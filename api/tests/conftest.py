@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import sys
+
+if sys.version_info >= (3, 12):
+    from typing import ForwardRef
+
+    if not getattr(ForwardRef._evaluate, "_patched", False):
+        _orig_evaluate = ForwardRef._evaluate
+
+        def _evaluate_with_guard(
+            self: ForwardRef,
+            globalns: dict | None,
+            localns: dict | None,
+            type_params=None,
+            *,
+            recursive_guard=None,
+        ):  # type: ignore[override]
+            if recursive_guard is None:
+                recursive_guard = set()
+            return _orig_evaluate(
+                self,
+                globalns,
+                localns,
+                type_params,
+                recursive_guard=recursive_guard,
+            )
+
+        _evaluate_with_guard._patched = True  # type: ignore[attr-defined]
+        ForwardRef._evaluate = _evaluate_with_guard  # type: ignore[assignment]
+
+import asyncio
+from typing import AsyncIterator, Callable, Iterator
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from api.dependencies import get_current_user, get_db
+from api.main import app
+from shared.models import Base, User
+
+
+@pytest.fixture(scope="session")
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Share one loop between session fixtures, tests and the ASGI app."""
+
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def engine() -> AsyncIterator[AsyncEngine]:
+    # Each pytest-xdist worker is its own process, so every worker gets a
+    # private in-memory database without any per-worker keying.
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINTs; let
+    # SQLAlchemy emit BEGIN itself so nested transactions behave.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_implicit_begin(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn) -> None:
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seed_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Sessions whose commits persist for the whole test session."""
+
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def session_factory(engine: AsyncEngine) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """Sessions joined to a per-test transaction that is rolled back afterwards.
+
+    Commits made by the app or the test only release a SAVEPOINT, so the
+    session-scoped seed data is left untouched for the next test.
+    """
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        yield async_sessionmaker(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def asgi_client() -> AsyncIterator[AsyncClient]:
+    """One transport and connection pool shared by every test."""
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture
+async def client(
+    asgi_client: AsyncClient,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncClient]:
+    """The shared client, with ``get_db`` bound to this test's transaction."""
+
+    async def override_get_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield asgi_client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def as_user() -> Iterator[Callable[[User], None]]:
+    """Authenticate subsequent requests as the given user for one test."""
+
+    def _set(user: User) -> None:
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    yield _set
+    app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict
+
+import pytest
+
+from api.routes.logs import _sse_frames
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _failing_events() -> AsyncIterator[Dict[str, Any]]:
+    yield {"level": "warning", "message": "first"}
+    raise RuntimeError("broker connection lost")
+
+
+async def _finite_events() -> AsyncIterator[Dict[str, Any]]:
+    yield {"level": "info", "message": "only"}
+
+
+async def test_stream_raises_when_producer_fails() -> None:
+    frames = _sse_frames(_failing_events())
+
+    first = await asyncio.wait_for(anext(frames), timeout=1)
+    assert first.startswith(b"event: warning\r\ndata: ")
+
+    # Without the close signal this would wait on the buffer forever.
+    with pytest.raises(RuntimeError, match="broker connection lost"):
+        await asyncio.wait_for(anext(frames), timeout=1)
+
+
+async def test_stream_ends_when_producer_finishes() -> None:
+    frames = [frame async for frame in _sse_frames(_finite_events())]
+
+    assert frames == [b'event: info\r\ndata: {"level":"info","message":"only"}\r\n\r\n']
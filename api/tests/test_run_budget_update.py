@@ -1,92 +1,49 @@
 from __future__ import annotations
 
-import asyncio
-import sys
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
-from pathlib import Path
-from typing import AsyncIterator
+from datetime import UTC, datetime
+from typing import Callable
 from uuid import UUID, uuid4
 
-if sys.version_info >= (3, 12):
-    from typing import ForwardRef
-
-    _orig_evaluate = ForwardRef._evaluate
-
-    def _evaluate_with_guard(
-        self: ForwardRef,
-        globalns: dict | None,
-        localns: dict | None,
-        type_params=None,
-        *,
-        recursive_guard=None,
-    ):  # type: ignore[override]
-        if recursive_guard is None:
-            recursive_guard = set()
-        return _orig_evaluate(
-            self,
-            globalns,
-            localns,
-            type_params,
-            recursive_guard=recursive_guard,
-        )
-
-    ForwardRef._evaluate = _evaluate_with_guard  # type: ignore[assignment]
-
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import StaticPool
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.models import PipelineRun, RunStatus, User
+
+from api.tests.timestamps import HOUR_AGO
 
-from api.dependencies import get_current_user, get_db
-from api.main import app
-from shared.models import Base, PipelineRun, RunStatus, User
+pytestmark = pytest.mark.asyncio
+
+NEW_BUDGETS = {"scrape": 25.5, "process": 12.0}
+# Request bodies are serialised once at import and sent as raw content.
+JSON_HEADERS = {"content-type": "application/json"}
+NEW_BUDGETS_BODY = orjson.dumps({"budgets": NEW_BUDGETS})
+NEGATIVE_BUDGETS_BODY = orjson.dumps({"budgets": {"scrape": -5}})
+INTRUDER_BUDGETS_BODY = orjson.dumps({"budgets": {"scrape": 12}})
 
 
 @dataclass
 class SeededRun:
+    owner: User
     owner_id: UUID
     run_id: UUID
     initial_updated_at: datetime
 
 
-@pytest.fixture(scope="session")
-def session_factory() -> async_sessionmaker[AsyncSession]:
-    engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-
-    async def prepare_schema() -> None:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-
-    asyncio.run(prepare_schema())
-    factory = async_sessionmaker(engine, expire_on_commit=False)
-
-    yield factory
-
-    asyncio.run(engine.dispose())
-
-
-@pytest.fixture(scope="session")
-def seeded_run(session_factory: async_sessionmaker[AsyncSession]) -> SeededRun:
+@pytest_asyncio.fixture(scope="session")
+async def seeded_run(seed_session_factory: async_sessionmaker[AsyncSession]) -> SeededRun:
     owner_id = uuid4()
     run_id = uuid4()
-    initial_updated_at = datetime.now(UTC) - timedelta(hours=1)
+    initial_updated_at = HOUR_AGO
+
+    owner = User(id=owner_id, email=f"{owner_id}@example.com", password_hash="hash")
 
     async def seed() -> None:
-        async with session_factory() as session:
-            user = User(
-                id=owner_id,
-                email="owner@example.com",
-                password_hash="hash",
-            )
+        async with seed_session_factory() as session:
             run = PipelineRun(
                 id=run_id,
                 owner_id=owner_id,
@@ -97,84 +54,111 @@ def seeded_run(session_factory: async_sessionmaker[AsyncSession]) -> SeededRun:
                 created_at=initial_updated_at,
                 updated_at=initial_updated_at,
             )
-            session.add_all([user, run])
+            session.add_all([owner, run])
             await session.commit()
 
-    asyncio.run(seed())
-    return SeededRun(owner_id=owner_id, run_id=run_id, initial_updated_at=initial_updated_at)
+    await seed()
+    return SeededRun(
+        owner=owner,
+        owner_id=owner_id,
+        run_id=run_id,
+        initial_updated_at=initial_updated_at,
+    )
+
 
+async def test_update_run_budgets_success(
+    client: AsyncClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    seeded_run: SeededRun,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_run.owner)
 
-@pytest.fixture
-def client(session_factory: async_sessionmaker[AsyncSession]) -> TestClient:
-    async def override_get_db() -> AsyncIterator[AsyncSession]:
+    response = await client.patch(
+        f"/runs/{seeded_run.run_id}/budgets",
+        content=NEW_BUDGETS_BODY,
+        headers=JSON_HEADERS,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["budgets"] == NEW_BUDGETS
+
+    async def fetch_run() -> Row | None:
         async with session_factory() as session:
-            yield session
+            result = await session.execute(
+                select(PipelineRun.budgets, PipelineRun.updated_at).where(
+                    PipelineRun.id == seeded_run.run_id
+                )
+            )
+            return result.one_or_none()
+
+    refreshed_run = await fetch_run()
+    assert refreshed_run is not None
+    assert refreshed_run.budgets == NEW_BUDGETS
+    updated_at = refreshed_run.updated_at
+    initial_updated_at = seeded_run.initial_updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=UTC)
+    if initial_updated_at.tzinfo is None:
+        initial_updated_at = initial_updated_at.replace(tzinfo=UTC)
+    assert updated_at > initial_updated_at
+
+
+async def test_update_run_budgets_rejects_negative_values(
+    client: AsyncClient,
+    seeded_run: SeededRun,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_run.owner)
 
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.pop(get_db, None)
+    response = await client.patch(
+        f"/runs/{seeded_run.run_id}/budgets",
+        content=NEGATIVE_BUDGETS_BODY,
+        headers=JSON_HEADERS,
+    )
+    assert response.status_code == 422
 
 
-def test_update_run_budgets_success(
-    client: TestClient, session_factory: async_sessionmaker[AsyncSession], seeded_run: SeededRun
-) -> None:
-    owner = User(id=seeded_run.owner_id, email="owner@example.com", password_hash="hash")
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        new_budgets = {"scrape": 25.5, "process": 12.0}
-        response = client.patch(
-            f"/runs/{seeded_run.run_id}/budgets",
-            json={"budgets": new_budgets},
-        )
-        assert response.status_code == 200
-        payload = response.json()
-        assert payload["budgets"] == new_budgets
-
-        async def fetch_run() -> PipelineRun | None:
-            async with session_factory() as session:
-                return await session.get(PipelineRun, seeded_run.run_id)
-
-        refreshed_run = asyncio.run(fetch_run())
-        assert refreshed_run is not None
-        assert refreshed_run.budgets == new_budgets
-        updated_at = refreshed_run.updated_at
-        initial_updated_at = seeded_run.initial_updated_at
-        if updated_at.tzinfo is None:
-            updated_at = updated_at.replace(tzinfo=UTC)
-        if initial_updated_at.tzinfo is None:
-            initial_updated_at = initial_updated_at.replace(tzinfo=UTC)
-        assert updated_at > initial_updated_at
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
-
-
-def test_update_run_budgets_rejects_negative_values(client: TestClient, seeded_run: SeededRun) -> None:
-    owner = User(id=seeded_run.owner_id, email="owner@example.com", password_hash="hash")
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        response = client.patch(
-            f"/runs/{seeded_run.run_id}/budgets",
-            json={"budgets": {"scrape": -5}},
-        )
-        assert response.status_code == 422
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
-
-
-def test_update_run_budgets_forbidden_for_other_user(
-    client: TestClient, seeded_run: SeededRun
+async def test_update_run_budgets_not_found_for_other_user(
+    client: AsyncClient,
+    seeded_run: SeededRun,
+    as_user: Callable[[User], None],
 ) -> None:
     other_user = User(id=uuid4(), email="intruder@example.com", password_hash="hash")
-    app.dependency_overrides[get_current_user] = lambda: other_user
-
-    try:
-        response = client.patch(
-            f"/runs/{seeded_run.run_id}/budgets",
-            json={"budgets": {"scrape": 12}},
-        )
-        assert response.status_code == 403
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+    as_user(other_user)
+
+    response = await client.patch(
+        f"/runs/{seeded_run.run_id}/budgets",
+        content=INTRUDER_BUDGETS_BODY,
+        headers=JSON_HEADERS,
+    )
+    assert response.status_code == 404
+
+
+async def test_run_json_matches_across_endpoints(
+    client: AsyncClient,
+    seeded_run: SeededRun,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_run.owner)
+
+    # The detail and list routes both render through ORJSONResponse and must
+    # agree on every field, including the budgets written just before.
+    updated = await client.patch(
+        f"/runs/{seeded_run.run_id}/budgets",
+        content=NEW_BUDGETS_BODY,
+        headers=JSON_HEADERS,
+    )
+    assert updated.status_code == 200
+
+    detail = await client.get(f"/runs/{seeded_run.run_id}")
+    assert detail.status_code == 200
+
+    listing = await client.get("/runs")
+    assert listing.status_code == 200
+    listed = next(
+        run for run in listing.json()["runs"] if run["id"] == str(seeded_run.run_id)
+    )
+
+    assert listed == detail.json()
+    assert detail.json()["budgets"] == updated.json()["budgets"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.dependencies import get_run, get_run_with_stages
+from shared.models import PipelineRun, RunStatus, StageState, User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def seed_owned_run(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> tuple[User, UUID]:
+    owner_id = uuid4()
+    owner = User(id=owner_id, email=f"{owner_id}@example.com", password_hash="hash")
+    run_id = uuid4()
+    async with session_factory() as session:
+        await session.execute(
+            insert(User), [dict(id=owner.id, email=owner.email, password_hash="hash")]
+        )
+        await session.execute(
+            insert(PipelineRun),
+            [
+                dict(
+                    id=run_id,
+                    owner_id=owner.id,
+                    status=RunStatus.PENDING,
+                    input_payload={},
+                    budgets={},
+                    telemetry={},
+                )
+            ],
+        )
+        await session.execute(
+            insert(StageState), [dict(id=uuid4(), run_id=run_id, name="scrape", telemetry={})]
+        )
+        await session.commit()
+    return owner, run_id
+
+
+async def test_get_run_leaves_stages_unloaded(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    owner, run_id = await seed_owned_run(session_factory)
+
+    async with session_factory() as session:
+        run = await get_run(run_id, owner, session)
+
+    assert "stages" in inspect(run).unloaded
+
+
+async def test_get_run_with_stages_eager_loads_stages(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    owner, run_id = await seed_owned_run(session_factory)
+
+    async with session_factory() as session:
+        run = await get_run_with_stages(run_id, owner, session)
+
+    assert "stages" not in inspect(run).unloaded
+    assert [stage.name for stage in run.stages] == ["scrape"]
+
+
+async def test_get_run_hides_other_users_runs(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    _, run_id = await seed_owned_run(session_factory)
+    intruder = User(id=uuid4(), email="intruder@example.com", password_hash="hash")
+
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as excinfo:
+            await get_run(run_id, intruder, session)
+
+    assert excinfo.value.status_code == 404
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.models import PipelineRun, RunStatus, User
+
+from api.tests.timestamps import HOUR_AGO
+
+pytestmark = pytest.mark.asyncio
+
+
+@dataclass
+class SeededRuns:
+    owner: User
+    # Newest first, the order the listing returns them in.
+    run_ids: list[UUID]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_runs(seed_session_factory: async_sessionmaker[AsyncSession]) -> SeededRuns:
+    owner_id = uuid4()
+    owner = User(id=owner_id, email=f"{owner_id}@example.com", password_hash="hash")
+    # Two runs share a created_at, so only the id tiebreak orders them.
+    tied_high, tied_low = sorted([uuid4(), uuid4()], reverse=True)
+    oldest = uuid4()
+    created = {tied_high: HOUR_AGO, tied_low: HOUR_AGO, oldest: HOUR_AGO - timedelta(seconds=1)}
+
+    async with seed_session_factory() as session:
+        session.add(owner)
+        await session.flush()
+        await session.execute(
+            insert(PipelineRun),
+            [
+                dict(
+                    id=run_id,
+                    owner_id=owner_id,
+                    status=RunStatus.PENDING,
+                    input_payload={},
+                    budgets={},
+                    telemetry={},
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                for run_id, created_at in created.items()
+            ],
+        )
+        await session.commit()
+
+    return SeededRuns(owner=owner, run_ids=[tied_high, tied_low, oldest])
+
+
+async def test_runs_are_paginated(
+    client: AsyncClient,
+    seeded_runs: SeededRuns,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_runs.owner)
+
+    # One run per page, so the created_at tie falls across a page boundary
+    # and the second page depends on the id half of the cursor.
+    seen: list[str] = []
+    cursor: str | None = None
+    for _ in seeded_runs.run_ids:
+        params: dict[str, str | int] = {"limit": 1}
+        if cursor is not None:
+            params["after"] = cursor
+        response = await client.get("/runs", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        seen.extend(run["id"] for run in payload["runs"])
+        cursor = payload["next_cursor"]
+
+    assert seen == [str(run_id) for run_id in seeded_runs.run_ids]
+    # The limit + 1 probe finds no row past the last run, so no cursor is issued.
+    assert cursor is None
+
+
+async def test_runs_reject_malformed_cursor(
+    client: AsyncClient,
+    seeded_runs: SeededRuns,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_runs.owner)
+
+    response = await client.get("/runs", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
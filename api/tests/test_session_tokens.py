@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.config import DEFAULT_JWT_SECRET, get_settings
+from shared.models import SessionToken, User
+from shared.security import sign_session_token, verify_session_token
+
+
+@pytest.fixture(autouse=True)
+def jwt_secret(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "jwt_secret", "test-secret")
+
+
+def test_signed_token_round_trip() -> None:
+    token_id, user_id = uuid4(), uuid4()
+    token = sign_session_token(token_id, user_id, int(time.time()) + 60)
+
+    assert len(token) <= 128
+    assert verify_session_token(token) == (token_id, user_id)
+
+
+def test_same_second_logins_get_distinct_tokens() -> None:
+    user_id = uuid4()
+    expires_at = int(time.time()) + 60
+
+    first = sign_session_token(uuid4(), user_id, expires_at)
+    second = sign_session_token(uuid4(), user_id, expires_at)
+
+    assert first != second
+
+
+def test_tampered_token_is_rejected() -> None:
+    token = sign_session_token(uuid4(), uuid4(), int(time.time()) + 60)
+    forged = sign_session_token(uuid4(), uuid4(), int(time.time()) + 60)
+    payload, _, _ = forged.partition(".")
+    _, _, signature = token.partition(".")
+
+    assert verify_session_token(f"{payload}.{signature}") is None
+    assert verify_session_token(token[:-2]) is None
+
+
+def test_expired_token_is_rejected() -> None:
+    token = sign_session_token(uuid4(), uuid4(), int(time.time()) - 1)
+
+    assert verify_session_token(token) is None
+
+
+def test_legacy_opaque_token_is_not_signed() -> None:
+    assert verify_session_token(str(uuid4())) is None
+
+
+def test_default_secret_is_never_trusted(monkeypatch: pytest.MonkeyPatch) -> None:
+    token = sign_session_token(uuid4(), uuid4(), int(time.time()) + 60)
+    monkeypatch.setattr(get_settings(), "jwt_secret", DEFAULT_JWT_SECRET)
+
+    assert verify_session_token(token) is None
+    with pytest.raises(RuntimeError):
+        sign_session_token(uuid4(), uuid4(), int(time.time()) + 60)
+
+
+async def seed_session(
+    session_factory: async_sessionmaker[AsyncSession], *, with_token_row: bool
+) -> tuple[str, str]:
+    user_id, token_id = uuid4(), uuid4()
+    email = f"{user_id}@example.com"
+    token = sign_session_token(token_id, user_id, int(time.time()) + 60)
+    async with session_factory() as session:
+        await session.execute(
+            insert(User), [dict(id=user_id, email=email, password_hash="hash")]
+        )
+        if with_token_row:
+            await session.execute(
+                insert(SessionToken), [dict(id=token_id, user_id=user_id, token=token)]
+            )
+        await session.commit()
+    return token, email
+
+
+@pytest.mark.asyncio
+async def test_signed_token_resolves_full_user(
+    client: AsyncClient, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    token, email = await seed_session(session_factory, with_token_row=True)
+
+    response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["email"] == email
+
+
+@pytest.mark.asyncio
+async def test_signed_token_without_session_row_is_rejected(
+    client: AsyncClient, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    token, _ = await seed_session(session_factory, with_token_row=False)
+
+    response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_cached_token(
+    client: AsyncClient, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    token, _ = await seed_session(session_factory, with_token_row=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+    response = await client.post("/auth/logout", headers=headers)
+    assert response.status_code == 204
+
+    assert (await client.get("/auth/me", headers=headers)).status_code == 401
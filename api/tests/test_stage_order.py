@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from shared.models import PipelineRun, RunStatus, StageState, User
+from shared.pipeline import PIPELINE_ORDER
+
+_MIGRATION = Path(__file__).resolve().parents[2] / "infra" / "migrations" / "0005_stage_sort_index.sql"
+
+
+def test_sort_index_migration_follows_pipeline_order() -> None:
+    sql = _MIGRATION.read_text(encoding="utf-8")
+    match = re.search(r"ARRAY\[([^\]]*)\]", sql)
+    assert match is not None
+    assert re.findall(r"'([^']*)'", match.group(1)) == PIPELINE_ORDER
+
+
+@pytest.mark.asyncio
+async def test_stages_with_equal_sort_index_load_by_name(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    owner_id, run_id = uuid4(), uuid4()
+    async with session_factory() as session:
+        await session.execute(
+            insert(User), [dict(id=owner_id, email=f"{owner_id}@example.com", password_hash="hash")]
+        )
+        await session.execute(
+            insert(PipelineRun),
+            [
+                dict(
+                    id=run_id,
+                    owner_id=owner_id,
+                    status=RunStatus.PENDING,
+                    input_payload={},
+                    budgets={},
+                    telemetry={},
+                )
+            ],
+        )
+        # Unknown stages share the fallback sort_index; name breaks the tie.
+        await session.execute(
+            insert(StageState),
+            [
+                dict(id=uuid4(), run_id=run_id, name=name, telemetry={})
+                for name in ("zz-custom", "export", "aa-custom", "scrape")
+            ],
+        )
+        await session.commit()
+
+    async with session_factory() as session:
+        run = await session.scalar(
+            select(PipelineRun)
+            .options(selectinload(PipelineRun.stages))
+            .where(PipelineRun.id == run_id)
+        )
+    assert [stage.name for stage in run.stages] == ["scrape", "export", "aa-custom", "zz-custom"]
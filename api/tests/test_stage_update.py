@@ -1,93 +1,40 @@
 from __future__ import annotations
 
-import asyncio
-import sys
 from dataclasses import dataclass
-from pathlib import Path
-from typing import AsyncIterator
+from typing import Callable
 from uuid import UUID, uuid4
 
-if sys.version_info >= (3, 12):
-    from typing import ForwardRef
-
-    _orig_evaluate = ForwardRef._evaluate
-
-    def _evaluate_with_guard(
-        self: ForwardRef,
-        globalns: dict | None,
-        localns: dict | None,
-        type_params=None,
-        *,
-        recursive_guard=None,
-    ):  # type: ignore[override]
-        if recursive_guard is None:
-            recursive_guard = set()
-        return _orig_evaluate(
-            self,
-            globalns,
-            localns,
-            type_params,
-            recursive_guard=recursive_guard,
-        )
-
-    ForwardRef._evaluate = _evaluate_with_guard  # type: ignore[assignment]
-
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import StaticPool
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.models import PipelineRun, RunStatus, StageState, StageStatus, User
 
-from api.main import app
-from api.dependencies import get_current_user, get_db
-from shared.models import Base, PipelineRun, RunStatus, StageState, StageStatus, User
+pytestmark = pytest.mark.asyncio
 
 
 @dataclass
 class SeededStage:
+    owner: User
     owner_id: UUID
     run_id: UUID
     stage_id: UUID
     stage_name: str
 
 
-@pytest.fixture(scope="session")
-def session_factory() -> async_sessionmaker[AsyncSession]:
-    engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-
-    async def prepare_schema() -> None:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-
-    asyncio.run(prepare_schema())
-    factory = async_sessionmaker(engine, expire_on_commit=False)
-
-    yield factory
-
-    asyncio.run(engine.dispose())
-
-
-@pytest.fixture(scope="session")
-def seeded_stage(session_factory: async_sessionmaker[AsyncSession]) -> SeededStage:
+@pytest_asyncio.fixture(scope="session")
+async def seeded_stage(seed_session_factory: async_sessionmaker[AsyncSession]) -> SeededStage:
     owner_id = uuid4()
     run_id = uuid4()
     stage_id = uuid4()
     stage_name = "qa"
 
+    owner = User(id=owner_id, email=f"{owner_id}@example.com", password_hash="hash")
+
     async def seed() -> None:
-        async with session_factory() as session:
-            user = User(
-                id=owner_id,
-                email="owner@example.com",
-                password_hash="hash",
-            )
+        async with seed_session_factory() as session:
             run = PipelineRun(
                 id=run_id,
                 owner_id=owner_id,
@@ -108,11 +55,12 @@ def seeded_stage(session_factory: async_sessionmaker[AsyncSession]) -> SeededSta
                 budget_spent=1.0,
                 notes="",
             )
-            session.add_all([user, run, stage])
+            session.add_all([owner, run, stage])
             await session.commit()
 
-    asyncio.run(seed())
+    await seed()
     return SeededStage(
+        owner=owner,
         owner_id=owner_id,
         run_id=run_id,
         stage_id=stage_id,
@@ -120,318 +68,293 @@ def seeded_stage(session_factory: async_sessionmaker[AsyncSession]) -> SeededSta
     )
 
 
-@pytest.fixture
-def client(session_factory: async_sessionmaker[AsyncSession]) -> TestClient:
-    async def override_get_db() -> AsyncIterator[AsyncSession]:
-        async with session_factory() as session:
-            yield session
-
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.pop(get_db, None)
-
-
-def create_run_with_stage(
+async def create_run_with_stage(
     session_factory: async_sessionmaker[AsyncSession],
     owner_id: UUID,
     *,
     run_status: RunStatus = RunStatus.PENDING,
     stage_status: StageStatus = StageStatus.PENDING,
+    stage_name: str | None = None,
+    run_telemetry: dict | None = None,
+    stage_telemetry: dict | None = None,
 ) -> tuple[UUID, str]:
     run_id = uuid4()
     stage_id = uuid4()
-    stage_name = f"stage-{run_id.hex[:8]}"
-
-    async def seed() -> None:
-        async with session_factory() as session:
-            run = PipelineRun(
-                id=run_id,
-                owner_id=owner_id,
-                status=run_status,
-                input_payload={},
-                budgets={},
-                telemetry={},
-            )
-            stage = StageState(
-                id=stage_id,
-                run_id=run_id,
-                name=stage_name,
-                status=stage_status,
-                telemetry={},
-                budget_spent=0.0,
-                notes="",
-            )
-            session.add_all([run, stage])
-            await session.commit()
-
-    asyncio.run(seed())
+    stage_name = stage_name or f"stage-{run_id.hex[:8]}"
+
+    async with session_factory() as session:
+        await session.execute(
+            insert(PipelineRun),
+            [
+                dict(
+                    id=run_id,
+                    owner_id=owner_id,
+                    status=run_status,
+                    input_payload={},
+                    budgets={},
+                    telemetry=run_telemetry or {},
+                )
+            ],
+        )
+        await session.execute(
+            insert(StageState),
+            [
+                dict(
+                    id=stage_id,
+                    run_id=run_id,
+                    name=stage_name,
+                    status=stage_status,
+                    telemetry=stage_telemetry or {},
+                    budget_spent=0.0,
+                    notes="",
+                )
+            ],
+        )
+        await session.commit()
     return run_id, stage_name
 
 
-def test_update_stage_notes(client: TestClient, seeded_stage: SeededStage) -> None:
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
-    )
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
-            json={"notes": "Ready for QA"},
-        )
-        assert response.status_code == 200
-        payload = response.json()
-        assert payload["notes"] == "Ready for QA"
-        assert payload["status"] == StageStatus.PENDING.value
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+async def fetch_run_status(
+    session_factory: async_sessionmaker[AsyncSession], run_id: UUID
+) -> RunStatus | None:
+    async with session_factory() as session:
+        return await session.scalar(select(PipelineRun.status).where(PipelineRun.id == run_id))
 
 
-def test_update_stage_status_to_skipped(
-    client: TestClient, seeded_stage: SeededStage
+async def test_update_stage_notes(
+    client: AsyncClient,
+    seeded_stage: SeededStage,
+    as_user: Callable[[User], None],
 ) -> None:
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
+    as_user(seeded_stage.owner)
+
+    response = await client.patch(
+        f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
+        json={"notes": "Ready for QA"},
     )
-    app.dependency_overrides[get_current_user] = lambda: owner
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["notes"] == "Ready for QA"
+    assert payload["status"] == StageStatus.PENDING.value
 
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
-            json={"status": StageStatus.SKIPPED.value},
-        )
-        assert response.status_code == 200
-        payload = response.json()
-        assert payload["status"] == StageStatus.SKIPPED.value
-        assert payload["finished_at"] is not None
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
 
+async def test_update_stage_status_to_skipped(
+    client: AsyncClient,
+    seeded_stage: SeededStage,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_stage.owner)
 
-def test_update_stage_telemetry_and_budget(
-    client: TestClient,
+    response = await client.patch(
+        f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
+        json={"status": StageStatus.SKIPPED.value},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == StageStatus.SKIPPED.value
+    assert payload["finished_at"] is not None
+
+
+@pytest.mark.parametrize(
+    ("initial_entry", "telemetry_update", "expected_entry"),
+    [
+        ({"initial": True}, {"new_metric": 42}, {"initial": True, "new_metric": 42}),
+        (None, {"fresh": "value"}, {"fresh": "value"}),
+    ],
+    ids=["merges-existing-run-entry", "creates-run-entry"],
+)
+async def test_update_stage_telemetry_and_budget(
+    client: AsyncClient,
     seeded_stage: SeededStage,
     session_factory: async_sessionmaker[AsyncSession],
+    as_user: Callable[[User], None],
+    initial_entry: dict | None,
+    telemetry_update: dict,
+    expected_entry: dict,
 ) -> None:
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
+    stage_name = f"stage-{uuid4().hex[:8]}"
+    run_telemetry: dict = {"other": {"untouched": True}}
+    if initial_entry is not None:
+        run_telemetry[stage_name] = dict(initial_entry)
+    run_id, stage_name = await create_run_with_stage(
+        session_factory,
+        seeded_stage.owner_id,
+        stage_name=stage_name,
+        run_telemetry=run_telemetry,
+        stage_telemetry={"existing": True},
     )
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
-            json={
-                "telemetry": {"new_metric": 42},
-                "budget_spent": 12.5,
-            },
-        )
-        assert response.status_code == 200
-        payload = response.json()
-        assert payload["telemetry"] == {"existing": True, "new_metric": 42}
-        assert payload["budget_spent"] == 12.5
-
-        async def fetch_state() -> tuple[StageState | None, PipelineRun | None]:
-            async with session_factory() as session:
-                stage_state = await session.get(StageState, seeded_stage.stage_id)
-                run_state = await session.get(PipelineRun, seeded_stage.run_id)
-                return stage_state, run_state
-
-        stage_state, run_state = asyncio.run(fetch_state())
-        assert stage_state is not None
-        assert stage_state.telemetry == {"existing": True, "new_metric": 42}
-        assert stage_state.budget_spent == 12.5
-        assert run_state is not None
-        stage_telemetry = run_state.telemetry.get(seeded_stage.stage_name, {})
-        assert stage_telemetry == {"initial": True, "new_metric": 42}
-        assert run_state.telemetry["other"] == {"untouched": True}
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
-
-
-def test_stage_status_running_updates_run_status(
-    client: TestClient,
+
+    as_user(seeded_stage.owner)
+
+    response = await client.patch(
+        f"/runs/{run_id}/stages/{stage_name}",
+        json={"telemetry": telemetry_update, "budget_spent": 12.5},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["telemetry"] == {"existing": True, **telemetry_update}
+    assert payload["budget_spent"] == 12.5
+
+    async def fetch_state() -> tuple[StageState | None, PipelineRun | None]:
+        async with session_factory() as session:
+            stage_state = await session.scalar(
+                select(StageState).where(
+                    StageState.run_id == run_id, StageState.name == stage_name
+                )
+            )
+            run_state = await session.get(PipelineRun, run_id)
+            return stage_state, run_state
+
+    stage_state, run_state = await fetch_state()
+    assert stage_state is not None
+    assert stage_state.telemetry == {"existing": True, **telemetry_update}
+    assert stage_state.budget_spent == 12.5
+    assert run_state is not None
+    assert run_state.telemetry.get(stage_name) == expected_entry
+    assert run_state.telemetry["other"] == {"untouched": True}
+
+
+async def test_stage_status_running_updates_run_status(
+    client: AsyncClient,
     seeded_stage: SeededStage,
     session_factory: async_sessionmaker[AsyncSession],
+    as_user: Callable[[User], None],
 ) -> None:
-    run_id, stage_name = create_run_with_stage(
+    run_id, stage_name = await create_run_with_stage(
         session_factory,
         seeded_stage.owner_id,
         run_status=RunStatus.PENDING,
         stage_status=StageStatus.PENDING,
     )
 
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
-    )
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        response = client.patch(
-            f"/runs/{run_id}/stages/{stage_name}",
-            json={"status": StageStatus.RUNNING.value},
-        )
-        assert response.status_code == 200
+    as_user(seeded_stage.owner)
 
-        run_response = client.get(f"/runs/{run_id}")
-        assert run_response.status_code == 200
-        run_payload = run_response.json()
-        assert run_payload["status"] == RunStatus.RUNNING.value
+    response = await client.patch(
+        f"/runs/{run_id}/stages/{stage_name}",
+        json={"status": StageStatus.RUNNING.value},
+    )
+    assert response.status_code == 200
 
-        async def fetch_run() -> PipelineRun | None:
-            async with session_factory() as session:
-                return await session.get(PipelineRun, run_id)
+    run_response = await client.get(f"/runs/{run_id}")
+    assert run_response.status_code == 200
+    run_payload = run_response.json()
+    assert run_payload["status"] == RunStatus.RUNNING.value
 
-        db_run = asyncio.run(fetch_run())
-        assert db_run is not None
-        assert db_run.status == RunStatus.RUNNING
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+    assert await fetch_run_status(session_factory, run_id) == RunStatus.RUNNING
 
 
-def test_stage_status_failed_updates_run_status(
-    client: TestClient,
+async def test_stage_status_failed_updates_run_status(
+    client: AsyncClient,
     seeded_stage: SeededStage,
     session_factory: async_sessionmaker[AsyncSession],
+    as_user: Callable[[User], None],
 ) -> None:
-    run_id, stage_name = create_run_with_stage(
+    run_id, stage_name = await create_run_with_stage(
         session_factory,
         seeded_stage.owner_id,
         run_status=RunStatus.RUNNING,
         stage_status=StageStatus.RUNNING,
     )
 
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
-    )
-    app.dependency_overrides[get_current_user] = lambda: owner
+    as_user(seeded_stage.owner)
 
-    try:
-        response = client.patch(
-            f"/runs/{run_id}/stages/{stage_name}",
-            json={"status": StageStatus.FAILED.value},
-        )
-        assert response.status_code == 200
-
-        run_response = client.get(f"/runs/{run_id}")
-        assert run_response.status_code == 200
-        run_payload = run_response.json()
-        assert run_payload["status"] == RunStatus.FAILED.value
+    response = await client.patch(
+        f"/runs/{run_id}/stages/{stage_name}",
+        json={"status": StageStatus.FAILED.value},
+    )
+    assert response.status_code == 200
 
-        async def fetch_run() -> PipelineRun | None:
-            async with session_factory() as session:
-                return await session.get(PipelineRun, run_id)
+    run_response = await client.get(f"/runs/{run_id}")
+    assert run_response.status_code == 200
+    run_payload = run_response.json()
+    assert run_payload["status"] == RunStatus.FAILED.value
 
-        db_run = asyncio.run(fetch_run())
-        assert db_run is not None
-        assert db_run.status == RunStatus.FAILED
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+    assert await fetch_run_status(session_factory, run_id) == RunStatus.FAILED
 
 
-def test_stage_status_completed_updates_run_status(
-    client: TestClient,
+async def test_stage_status_completed_updates_run_status(
+    client: AsyncClient,
     seeded_stage: SeededStage,
     session_factory: async_sessionmaker[AsyncSession],
+    as_user: Callable[[User], None],
 ) -> None:
-    run_id, stage_name = create_run_with_stage(
+    run_id, stage_name = await create_run_with_stage(
         session_factory,
         seeded_stage.owner_id,
         run_status=RunStatus.RUNNING,
         stage_status=StageStatus.RUNNING,
     )
 
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
-    )
-    app.dependency_overrides[get_current_user] = lambda: owner
-
-    try:
-        response = client.patch(
-            f"/runs/{run_id}/stages/{stage_name}",
-            json={"status": StageStatus.COMPLETED.value},
-        )
-        assert response.status_code == 200
+    as_user(seeded_stage.owner)
 
-        run_response = client.get(f"/runs/{run_id}")
-        assert run_response.status_code == 200
-        run_payload = run_response.json()
-        assert run_payload["status"] == RunStatus.COMPLETED.value
+    response = await client.patch(
+        f"/runs/{run_id}/stages/{stage_name}",
+        json={"status": StageStatus.COMPLETED.value},
+    )
+    assert response.status_code == 200
 
-        async def fetch_run() -> PipelineRun | None:
-            async with session_factory() as session:
-                return await session.get(PipelineRun, run_id)
+    run_response = await client.get(f"/runs/{run_id}")
+    assert run_response.status_code == 200
+    run_payload = run_response.json()
+    assert run_payload["status"] == RunStatus.COMPLETED.value
 
-        db_run = asyncio.run(fetch_run())
-        assert db_run is not None
-        assert db_run.status == RunStatus.COMPLETED
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+    assert await fetch_run_status(session_factory, run_id) == RunStatus.COMPLETED
 
 
-def test_update_stage_rejects_negative_budget(
-    client: TestClient,
+async def test_update_stage_rejects_negative_budget(
+    client: AsyncClient,
     seeded_stage: SeededStage,
+    as_user: Callable[[User], None],
 ) -> None:
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
-    )
-    app.dependency_overrides[get_current_user] = lambda: owner
+    as_user(seeded_stage.owner)
 
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
-            json={"budget_spent": -1},
-        )
-        assert response.status_code == 422
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+    response = await client.patch(
+        f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
+        json={"budget_spent": -1},
+    )
+    assert response.status_code == 422
 
 
-def test_update_stage_rejects_unauthorized_user(
-    client: TestClient, seeded_stage: SeededStage
+async def test_update_stage_rejects_unauthorized_user(
+    client: AsyncClient,
+    seeded_stage: SeededStage,
+    as_user: Callable[[User], None],
 ) -> None:
     other_user = User(id=uuid4(), email="other@example.com", password_hash="hash")
-    app.dependency_overrides[get_current_user] = lambda: other_user
+    as_user(other_user)
+
+    response = await client.patch(
+        f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
+        json={"notes": "Attempted update"},
+    )
+    assert response.status_code == 404
 
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/{seeded_stage.stage_name}",
-            json={"notes": "Attempted update"},
-        )
-        assert response.status_code == 403
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
 
+async def test_update_stage_missing_stage(
+    client: AsyncClient,
+    seeded_stage: SeededStage,
+    as_user: Callable[[User], None],
+) -> None:
+    as_user(seeded_stage.owner)
 
-def test_update_stage_missing_stage(client: TestClient, seeded_stage: SeededStage) -> None:
-    owner = User(
-        id=seeded_stage.owner_id,
-        email="owner@example.com",
-        password_hash="hash",
+    response = await client.patch(
+        f"/runs/{seeded_stage.run_id}/stages/does-not-exist",
+        json={"notes": "Missing"},
     )
-    app.dependency_overrides[get_current_user] = lambda: owner
+    assert response.status_code == 404
 
-    try:
-        response = client.patch(
-            f"/runs/{seeded_stage.run_id}/stages/does-not-exist",
-            json={"notes": "Missing"},
-        )
-        assert response.status_code == 404
-    finally:
-        app.dependency_overrides.pop(get_current_user, None)
+
+async def test_seeded_stage_is_reset_between_tests(
+    seeded_stage: SeededStage,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    # Earlier tests in this module mutate the shared stage; their changes must
+    # have been rolled back with their per-test transaction.
+    async with session_factory() as session:
+        stage_state = await session.get(StageState, seeded_stage.stage_id)
+
+    assert stage_state is not None
+    assert stage_state.status == StageStatus.PENDING
+    assert stage_state.notes == ""
+    assert stage_state.telemetry == {"existing": True}
+    assert stage_state.budget_spent == 1.0
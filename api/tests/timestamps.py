@@ -0,0 +1,11 @@
+"""Fixed seed timestamps shared by the API tests.
+
+They sit in the past, so seeds need no clock reads and stay older than
+anything the API stamps during a test.
+"""
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=UTC)
+HOUR_AGO = NOW - timedelta(hours=1)
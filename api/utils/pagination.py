@@ -0,0 +1,29 @@
+"""Helpers for opaque keyset pagination cursors."""
+from __future__ import annotations
+
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Encode a ``(created_at, id)`` keyset position as an opaque token."""
+
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a token produced by :func:`encode_cursor`."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
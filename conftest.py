@@ -0,0 +1,6 @@
+"""Repository-wide pytest configuration.
+
+Pytest inserts this file's directory into ``sys.path`` before collecting any
+tests, so ``api``, ``nlp``, ``shared`` and friends import from the checkout
+without each test module patching the path itself.
+"""
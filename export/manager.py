@@ -3,18 +3,83 @@ from __future__ import annotations
 
 import datetime as dt
 import hashlib
-import io
-import json
 import mimetypes
+import os
+import stat
+import tempfile
+import time
 import uuid
 import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import IO, Any, Deque, Dict, Iterable, List, Tuple
+
+import orjson
+from sqlalchemy import insert
 
 from shared.config import get_settings
 from shared.models import AssetRecord
 from shared.stages.base import BaseStage
-from shared.storage import SignedUpload, upload_bytes
+from shared.storage import SignedUpload, upload_bytes, upload_fileobj
+
+# Bundles larger than this spill from memory to a temporary file on disk.
+_BUNDLE_SPOOL_BYTES = 64 << 20
+# Image formats that are already compressed; deflating them burns CPU for no gain.
+_PRECOMPRESSED_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".webp"})
+_READ_WORKERS = 4
+# Files up to this size are read whole on worker threads ahead of the
+# compressor; larger ones are streamed through ZipFile.write in small chunks.
+_READ_AHEAD_MAX_FILE_BYTES = 1 << 20
+# Caps on what the read-ahead window holds at once, by count and by bytes.
+_READ_AHEAD_FILES = 8
+_READ_AHEAD_BYTES = 16 << 20
+_MANIFEST_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+
+
+@lru_cache(maxsize=256)
+def _mime_type_for(suffixes: str) -> str:
+    # Keyed on the last two suffixes so encodings such as ".tar.gz" still
+    # resolve the way guess_type does for the full file name.
+    return mimetypes.guess_type(f"asset{suffixes}")[0] or "application/octet-stream"
+
+
+@dataclass(slots=True)
+class GatheredFile:
+    """A file picked up for export, with the stat taken when it was found."""
+
+    path: Path
+    stat: os.stat_result
+    name_lower: str
+    suffix_lower: str
+
+
+class _HashingWriter:
+    """Forward writes to ``fp`` while feeding them to a running SHA-256.
+
+    It deliberately has no ``seek``: ZipFile then streams entries with data
+    descriptors instead of seeking back to patch local headers, so every byte
+    is written exactly once and the running digest matches the final file.
+    """
+
+    def __init__(self, fp: IO[bytes]) -> None:
+        self._fp = fp
+        self._digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self._digest.update(data)
+        return self._fp.write(data)
+
+    def tell(self) -> int:
+        return self._fp.tell()
+
+    def flush(self) -> None:
+        self._fp.flush()
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
 
 
 class ExportStage(BaseStage):
@@ -29,23 +94,28 @@ class ExportStage(BaseStage):
         generated_at = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
 
         output_root = self._resolve_output_root(run_id_str)
-        csv_paths = self._gather_csvs(output_root)
-        image_paths = self._gather_images(output_root)
-        qa_paths = self._gather_qa_reports(output_root, run_id_str)
-
-        collected_assets: List[Tuple[str, Path]] = (
-            [("csvs", path) for path in csv_paths]
-            + [("images", path) for path in image_paths]
-            + [("qa_reports", path) for path in qa_paths]
+        csv_files = self._gather_csvs(output_root)
+        image_files = self._gather_images(output_root)
+        qa_files = self._gather_qa_reports(output_root, run_id_str)
+
+        collected_assets: List[Tuple[str, GatheredFile]] = (
+            [("csvs", item) for item in csv_files]
+            + [("images", item) for item in image_files]
+            + [("qa_reports", item) for item in qa_files]
         )
 
+        cwd = Path.cwd()
         assets_metadata = {
-            "csvs": [self._file_metadata(path, "csvs") for path in csv_paths],
-            "images": [self._file_metadata(path, "images") for path in image_paths],
-            "qa_reports": [self._file_metadata(path, "qa_reports") for path in qa_paths],
+            "csvs": [self._file_metadata(item, "csvs", cwd) for item in csv_files],
+            "images": [self._file_metadata(item, "images", cwd) for item in image_files],
+            "qa_reports": [self._file_metadata(item, "qa_reports", cwd) for item in qa_files],
+        }
+        asset_counts = {
+            "csvs": len(csv_files),
+            "images": len(image_files),
+            "qa_reports": len(qa_files),
+            "total": len(collected_assets),
         }
-        asset_counts = {category: len(items) for category, items in assets_metadata.items()}
-        asset_counts["total"] = sum(asset_counts.values())
 
         optional_exports = self._gather_optional_exports(settings)
         readme_entries = self._build_readme_map(assets_metadata, optional_exports)
@@ -71,19 +141,18 @@ class ExportStage(BaseStage):
             "counts": asset_counts,
         }
 
-        manifest_bytes, bundle_bytes = self._materialize_bundle(
+        manifest_bytes, bundle_file = self._materialize_bundle(
             collected_assets,
             manifest_document,
             readme_md,
             output_root,
+            cwd,
+            generated_at,
         )
         manifest_hash = hashlib.sha256(manifest_bytes).hexdigest()
         manifest_size = len(manifest_bytes)
-        bundle_size = len(bundle_bytes)
-        bundle_hash = hashlib.sha256(bundle_bytes).hexdigest()
-
-        manifest_document["bundle"]["size_bytes"] = bundle_size
-        manifest_document["bundle"]["sha256"] = bundle_hash
+        bundle_size = manifest_document["bundle"]["size_bytes"]
+        bundle_hash = manifest_document["bundle"]["sha256"]
 
         ttl = settings.export_bundle_ttl_seconds
         manifest_upload: SignedUpload | None = None
@@ -91,27 +160,35 @@ class ExportStage(BaseStage):
         bundle_upload: SignedUpload | None = None
         bundle_error: str | None = None
 
-        try:
-            manifest_upload = upload_bytes(
+        # The two uploads are independent network calls; run them side by side.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            manifest_future = pool.submit(
+                upload_bytes,
                 manifest_key,
                 manifest_bytes,
                 content_type="application/json",
                 ttl_seconds=ttl,
             )
-        except Exception as exc:  # pragma: no cover - optional dependency path
-            manifest_error = str(exc)
-
-        try:
-            bundle_upload = upload_bytes(
+            bundle_future = pool.submit(
+                upload_fileobj,
                 bundle_key,
-                bundle_bytes,
+                bundle_file,
+                bundle_size,
                 content_type="application/zip",
                 ttl_seconds=ttl,
             )
-        except Exception as exc:  # pragma: no cover - optional dependency path
-            bundle_error = str(exc)
+            try:
+                manifest_upload = manifest_future.result()
+            except Exception as exc:  # pragma: no cover - optional dependency path
+                manifest_error = str(exc)
+            try:
+                bundle_upload = bundle_future.result()
+            except Exception as exc:  # pragma: no cover - optional dependency path
+                bundle_error = str(exc)
+            finally:
+                bundle_file.close()
 
-        manifest_record = self._persist_asset_record(
+        manifest_row = self._asset_record_row(
             run_id=run.id,
             asset_type="manifest",
             storage_key=manifest_upload.key if manifest_upload else f"minio-unavailable://{manifest_error}",
@@ -131,7 +208,7 @@ class ExportStage(BaseStage):
             },
         )
 
-        bundle_record = self._persist_asset_record(
+        bundle_row = self._asset_record_row(
             run_id=run.id,
             asset_type="export_bundle",
             storage_key=bundle_upload.key if bundle_upload else f"minio-unavailable://{bundle_error}",
@@ -152,18 +229,17 @@ class ExportStage(BaseStage):
             },
         )
 
-        session.add(manifest_record)
-        session.add(bundle_record)
+        session.execute(insert(AssetRecord), [manifest_row, bundle_row])
         session.commit()
 
         telemetry: Dict[str, Any] = {
             "manifest": {
-                "storage_key": manifest_record.storage_key,
+                "storage_key": manifest_row["storage_key"],
                 "size_bytes": manifest_size,
                 "sha256": manifest_hash,
             },
             "bundle": {
-                "storage_key": bundle_record.storage_key,
+                "storage_key": bundle_row["storage_key"],
                 "size_bytes": bundle_size,
                 "sha256": bundle_hash,
             },
@@ -212,7 +288,7 @@ class ExportStage(BaseStage):
             return default
         return Path(".")
 
-    def _gather_csvs(self, output_root: Path) -> List[Path]:
+    def _gather_csvs(self, output_root: Path) -> List[GatheredFile]:
         directories = [
             output_root / "audiences",
             output_root / "creatives",
@@ -220,7 +296,7 @@ class ExportStage(BaseStage):
         ]
         return self._gather_files(directories, ["**/*.csv"])
 
-    def _gather_images(self, output_root: Path) -> List[Path]:
+    def _gather_images(self, output_root: Path) -> List[GatheredFile]:
         directories = [
             output_root / "creatives" / "images",
             output_root / "images",
@@ -228,7 +304,7 @@ class ExportStage(BaseStage):
         patterns = ["**/*.png", "**/*.jpg", "**/*.jpeg", "**/*.webp"]
         return self._gather_files(directories, patterns)
 
-    def _gather_qa_reports(self, output_root: Path, run_id: str) -> List[Path]:
+    def _gather_qa_reports(self, output_root: Path, run_id: str) -> List[GatheredFile]:
         directories = [
             output_root / "qa_reports",
             Path("qa_reports") / run_id,
@@ -237,53 +313,77 @@ class ExportStage(BaseStage):
         ]
         return self._gather_files(directories, ["**/*"])  # filtered in metadata helper
 
-    def _gather_files(self, directories: Iterable[Path], patterns: Iterable[str]) -> List[Path]:
-        seen: set[Path] = set()
-        results: List[Path] = []
+    def _gather_files(
+        self, directories: Iterable[Path], patterns: Iterable[str]
+    ) -> List[GatheredFile]:
+        # One os.walk per root instead of one glob per pattern; patterns are
+        # only ever "**/*.<ext>" or "**/*", so matching on the suffix suffices.
+        extensions = frozenset(
+            pattern.rsplit(".", 1)[-1].lower() for pattern in patterns if "." in pattern
+        )
+        seen: set[str] = set()
+        results: List[GatheredFile] = []
         for directory in directories:
-            if not directory.exists():
+            if not os.path.isdir(directory):
                 continue
-            for pattern in patterns:
-                for path in directory.glob(pattern):
-                    if path.is_file():
-                        resolved = path.resolve()
-                        if resolved in seen:
-                            continue
-                        seen.add(resolved)
-                        results.append(path)
-        results.sort()
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    if extensions and filename.rsplit(".", 1)[-1].lower() not in extensions:
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        file_stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if not stat.S_ISREG(file_stat.st_mode):
+                        continue
+                    resolved = os.path.realpath(path)
+                    if resolved in seen:
+                        continue
+                    seen.add(resolved)
+                    gathered_path = Path(path)
+                    results.append(
+                        GatheredFile(
+                            gathered_path,
+                            file_stat,
+                            filename.lower(),
+                            gathered_path.suffix.lower(),
+                        )
+                    )
+        results.sort(key=lambda item: item.path)
         return results
 
-    def _file_metadata(self, path: Path, category: str) -> Dict[str, Any]:
-        stat = path.stat()
+    def _file_metadata(self, item: GatheredFile, category: str, cwd: Path) -> Dict[str, Any]:
+        path = item.path
         try:
-            relative = path.relative_to(Path.cwd())
+            relative = path.relative_to(cwd)
         except ValueError:
             relative = path
         relative_str = str(relative)
-        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
-        description = self._describe_asset(path, category)
+        mime_type = _mime_type_for("".join(path.suffixes[-2:]).lower())
+        description = self._describe_asset(item, category)
         return {
             "path": relative_str,
             "category": category,
-            "size_bytes": stat.st_size,
-            "modified_at": dt.datetime.fromtimestamp(stat.st_mtime, tz=dt.timezone.utc).isoformat(),
+            "size_bytes": item.stat.st_size,
+            "modified_at": dt.datetime.fromtimestamp(item.stat.st_mtime, tz=dt.timezone.utc).isoformat(),
             "mime_type": mime_type,
             "description": description,
         }
 
-    def _describe_asset(self, path: Path, category: str) -> str:
-        name = path.name.lower()
-        if "audiences" in name and path.suffix.lower() == ".csv":
+    def _describe_asset(self, item: GatheredFile, category: str) -> str:
+        name = item.name_lower
+        suffix = item.suffix_lower
+        if "audiences" in name and suffix == ".csv":
             return "Audience matrix CSV export"
-        if "scroll" in name and path.suffix.lower() == ".csv":
+        if "scroll" in name and suffix == ".csv":
             return "Scroll stoppers creative CSV export"
         if category == "images":
             return "Rendered creative image"
         if category == "qa_reports":
-            if path.suffix.lower() in {".html", ".htm"}:
+            if suffix in {".html", ".htm"}:
                 return "QA report (HTML)"
-            if path.suffix.lower() in {".json", ".csv"}:
+            if suffix in {".json", ".csv"}:
                 return "QA diagnostic artifact"
             return "QA report artifact"
         return f"{category[:-1].capitalize()} asset"
@@ -296,8 +396,7 @@ class ExportStage(BaseStage):
         entries: List[Dict[str, Any]] = []
         for category, items in assets_metadata.items():
             for item in items:
-                path = Path(item["path"])
-                title = self._title_for_entry(path, category)
+                title = self._title_for_entry(os.path.basename(item["path"]), category)
                 entries.append(
                     {
                         "title": title,
@@ -330,18 +429,19 @@ class ExportStage(BaseStage):
                 )
         return entries
 
-    def _title_for_entry(self, path: Path, category: str) -> str:
+    def _title_for_entry(self, name: str, category: str) -> str:
         if category == "csvs":
-            if "audiences" in path.name.lower():
+            name_lower = name.lower()
+            if "audiences" in name_lower:
                 return "Audiences Master CSV"
-            if "scroll" in path.name.lower():
+            if "scroll" in name_lower:
                 return "Scroll Stoppers CSV"
-            return f"CSV Export ({path.name})"
+            return f"CSV Export ({name})"
         if category == "images":
-            return f"Rendered Image ({path.name})"
+            return f"Rendered Image ({name})"
         if category == "qa_reports":
-            return f"QA Report ({path.name})"
-        return f"{category.title()} ({path.name})"
+            return f"QA Report ({name})"
+        return f"{category.title()} ({name})"
 
     def _render_readme(
         self,
@@ -386,77 +486,169 @@ class ExportStage(BaseStage):
 
     def _materialize_bundle(
         self,
-        assets: List[Tuple[str, Path]],
+        assets: List[Tuple[str, GatheredFile]],
         manifest_document: Dict[str, Any],
         readme_md: str,
         output_root: Path,
-    ) -> Tuple[bytes, bytes]:
-        manifest_document["bundle"].setdefault("size_bytes", 0)
-        manifest_document["bundle"].setdefault("sha256", "")
-        manifest_bytes = b""
-        bundle_bytes = b""
-        for _ in range(5):
-            manifest_bytes = json.dumps(manifest_document, indent=2, sort_keys=True).encode("utf-8")
-            bundle_bytes = self._build_bundle_bytes(assets, manifest_bytes, readme_md, output_root)
-            bundle_hash = hashlib.sha256(bundle_bytes).hexdigest()
-            bundle_size = len(bundle_bytes)
-            if (
-                bundle_size == manifest_document["bundle"].get("size_bytes")
-                and bundle_hash == manifest_document["bundle"].get("sha256")
-            ):
-                break
-            manifest_document["bundle"]["size_bytes"] = bundle_size
-            manifest_document["bundle"]["sha256"] = bundle_hash
-        return manifest_bytes, bundle_bytes
-
-    def _build_bundle_bytes(
+        cwd: Path,
+        generated_at: dt.datetime,
+    ) -> Tuple[bytes, IO[bytes]]:
+        # A zip cannot carry its own digest, so the embedded manifest.json omits
+        # the bundle size/hash; only the standalone uploaded manifest records them.
+        bundle_entry = manifest_document["bundle"]
+        embedded_document = {
+            **manifest_document,
+            "bundle": {"storage_key": bundle_entry["storage_key"]},
+        }
+        embedded_bytes = orjson.dumps(embedded_document, option=_MANIFEST_JSON_OPTIONS)
+        bundle_file, bundle_size, bundle_hash = self._build_bundle_file(
+            assets, embedded_bytes, readme_md, output_root, cwd, generated_at
+        )
+        bundle_entry["size_bytes"] = bundle_size
+        bundle_entry["sha256"] = bundle_hash
+
+        manifest_bytes = orjson.dumps(manifest_document, option=_MANIFEST_JSON_OPTIONS)
+        return manifest_bytes, bundle_file
+
+    def _build_bundle_file(
         self,
-        assets: List[Tuple[str, Path]],
+        assets: List[Tuple[str, GatheredFile]],
         manifest_bytes: bytes,
         readme_md: str,
         output_root: Path,
-    ) -> bytes:
-        buffer = io.BytesIO()
+        cwd: Path,
+        generated_at: dt.datetime,
+    ) -> Tuple[IO[bytes], int, str]:
+        """Spool the bundle to a temp file; return it rewound with its size and sha256."""
+
+        spool = tempfile.SpooledTemporaryFile(max_size=_BUNDLE_SPOOL_BYTES)
+        writer = _HashingWriter(spool)
+        cwd_str = os.fspath(cwd)
+        entries: List[Tuple[GatheredFile, str]] = []
         seen: set[str] = set()
-        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-            for category, path in assets:
-                if not path.exists() or not path.is_file():
-                    continue
-                arcname = self._archive_name(category, path, output_root)
-                if arcname in seen:
-                    continue
-                archive.write(path, arcname)
-                seen.add(arcname)
-            archive.writestr("manifest.json", manifest_bytes)
-            archive.writestr("README_MAP.md", readme_md)
-        return buffer.getvalue()
-
-    def _archive_name(self, category: str, path: Path, output_root: Path) -> str:
-        try:
-            relative = path.relative_to(output_root)
-        except ValueError:
-            try:
-                relative = path.relative_to(Path.cwd())
-            except ValueError:
-                relative = path.name
-        else:
-            relative = Path(category) / relative
-            return str(relative)
-        return str(Path(category) / Path(relative))
+        for category, item in assets:
+            arcname = self._archive_name(category, item.path, output_root, cwd_str)
+            if arcname in seen:
+                continue
+            seen.add(arcname)
+            entries.append((item, arcname))
 
-    def _persist_asset_record(
+        try:
+            with zipfile.ZipFile(
+                writer,
+                "w",
+                compression=zipfile.ZIP_DEFLATED,
+                compresslevel=1,
+                strict_timestamps=False,
+            ) as archive, ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+                # Small files are read on worker threads so disk I/O overlaps with
+                # compression here; the window is bounded by bytes as well as
+                # count, and large files never enter it, so memory stays flat.
+                pending: Deque[Tuple[GatheredFile, str, Future[bytes] | None]] = deque()
+                remaining = iter(entries)
+                buffered = 0
+                while True:
+                    while len(pending) < _READ_AHEAD_FILES and buffered < _READ_AHEAD_BYTES:
+                        next_entry = next(remaining, None)
+                        if next_entry is None:
+                            break
+                        next_item, next_arcname = next_entry
+                        size = next_item.stat.st_size
+                        if size > _READ_AHEAD_MAX_FILE_BYTES:
+                            pending.append((next_item, next_arcname, None))
+                            continue
+                        pending.append(
+                            (next_item, next_arcname, pool.submit(next_item.path.read_bytes))
+                        )
+                        buffered += size
+                    if not pending:
+                        break
+                    item, arcname, future = pending.popleft()
+                    compress_type = (
+                        zipfile.ZIP_STORED
+                        if item.suffix_lower in _PRECOMPRESSED_SUFFIXES
+                        else zipfile.ZIP_DEFLATED
+                    )
+                    if future is None:
+                        try:
+                            archive.write(
+                                item.path, arcname, compress_type=compress_type, compresslevel=1
+                            )
+                        except FileNotFoundError:
+                            pass
+                        continue
+                    buffered -= item.stat.st_size
+                    try:
+                        data = future.result()
+                    except FileNotFoundError:
+                        continue
+                    zinfo = self._zip_info(arcname, item.stat)
+                    zinfo.compress_type = compress_type
+                    archive.writestr(zinfo, data, compresslevel=1)
+                    del data
+                # Generated members carry this export's generated_at, the instant
+                # the embedded manifest records, rather than the time each entry is
+                # written. Entry timestamps and order are fixed within one build;
+                # separate exports record their own generated_at and so differ.
+                archive.writestr(
+                    self._generated_zip_info("manifest.json", generated_at),
+                    manifest_bytes,
+                    compresslevel=1,
+                )
+                archive.writestr(
+                    self._generated_zip_info("README_MAP.md", generated_at),
+                    readme_md,
+                    compresslevel=1,
+                )
+        except BaseException:
+            spool.close()
+            raise
+        size = spool.tell()
+        spool.seek(0)
+        return spool, size, writer.hexdigest()
+
+    def _zip_info(self, arcname: str, file_stat: os.stat_result) -> zipfile.ZipInfo:
+        # Same fields ZipInfo.from_file fills in, taken from the gather-time stat.
+        date_time = time.localtime(file_stat.st_mtime)[:6]
+        if date_time[0] < 1980:
+            date_time = (1980, 1, 1, 0, 0, 0)
+        zinfo = zipfile.ZipInfo(arcname, date_time)
+        zinfo.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+        zinfo.file_size = file_stat.st_size
+        return zinfo
+
+    def _generated_zip_info(self, arcname: str, generated_at: dt.datetime) -> zipfile.ZipInfo:
+        zinfo = zipfile.ZipInfo(arcname, generated_at.timetuple()[:6])
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.external_attr = 0o644 << 16
+        return zinfo
+
+    def _archive_name(self, category: str, path: Path, output_root: Path, cwd: str) -> str:
+        # Plain string prefix checks; gathered paths are built from the same
+        # roots, so this matches what Path.relative_to would return.
+        path_str = os.fspath(path)
+        root = os.fspath(output_root)
+        if root == os.curdir:
+            if not os.path.isabs(path_str):
+                return f"{category}/{path_str}"
+        elif path_str.startswith(root + os.sep):
+            return f"{category}/{path_str[len(root) + 1:]}"
+        if path_str.startswith(cwd + os.sep):
+            return f"{category}/{path_str[len(cwd) + 1:]}"
+        return f"{category}/{os.path.basename(path_str)}"
+
+    def _asset_record_row(
         self,
         run_id,
         asset_type: str,
         storage_key: str,
         extra: Dict[str, Any],
-    ) -> AssetRecord:
-        record = AssetRecord(
-            id=uuid.uuid4(),
-            run_id=run_id,
-            stage=self.name,
-            asset_type=asset_type,
-            storage_key=storage_key,
-            extra=extra,
-        )
-        return record
+    ) -> Dict[str, Any]:
+        return {
+            "id": uuid.uuid4(),
+            "run_id": run_id,
+            "stage": self.name,
+            "asset_type": asset_type,
+            "storage_key": storage_key,
+            "extra": extra,
+        }
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import io
+import threading
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List
+
+import orjson
+import pytest
+
+import export.manager as manager
+from export.manager import ExportStage
+from shared.stages.base import StageContext
+from shared.storage import SignedUpload
+
+
+class _Run:
+    def __init__(self) -> None:
+        self.id = uuid.uuid4()
+        self.budgets = {"export": 20.0}
+        self.telemetry: Dict[str, Any] = {}
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.rows: List[Dict[str, Any]] = []
+
+    def execute(self, _statement: Any, rows: List[Dict[str, Any]]) -> None:
+        self.rows.extend(rows)
+
+    def commit(self) -> None:
+        pass
+
+
+@pytest.fixture
+def uploads(monkeypatch: pytest.MonkeyPatch) -> Dict[str, bytes]:
+    """Capture uploads; both fakes wait on a barrier, so they must run concurrently."""
+
+    uploaded: Dict[str, bytes] = {}
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_upload_fileobj(
+        key: str,
+        data: BinaryIO,
+        length: int,
+        content_type: str = "application/octet-stream",
+        ttl_seconds: int | None = None,
+    ) -> SignedUpload:
+        barrier.wait()
+        payload = data.read(length)
+        uploaded[key] = payload
+        return SignedUpload(
+            key=key,
+            size=len(payload),
+            content_type=content_type,
+            signed_url=f"https://storage.test/{key}",
+            expires_at=dt.datetime.now(dt.timezone.utc),
+        )
+
+    def fake_upload_bytes(
+        key: str,
+        payload: bytes,
+        content_type: str = "application/octet-stream",
+        ttl_seconds: int | None = None,
+    ) -> SignedUpload:
+        return fake_upload_fileobj(key, io.BytesIO(payload), len(payload), content_type, ttl_seconds)
+
+    monkeypatch.setattr(manager, "upload_fileobj", fake_upload_fileobj)
+    monkeypatch.setattr(manager, "upload_bytes", fake_upload_bytes)
+    return uploaded
+
+
+def test_bundle_contents_hash_and_manifest(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, uploads: Dict[str, bytes]
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    run = _Run()
+    root = tmp_path / "outputs" / str(run.id)
+    # Archive name -> payload; each file lives under the run's output root
+    # at the archive name minus its category prefix.
+    files = {
+        "csvs/audiences/audiences_master.csv": b"name,blockers\nRenters,price\n" * 50,
+        "images/creatives/images/hero.png": bytes(range(256)) * 8,
+        "images/creatives/images/alt.jpg": b"\xff\xd8" + bytes(4000),
+        "qa_reports/qa_reports/report.html": b"<html>ok</html>",
+        # Larger than the read-ahead cut-off, so it takes the streaming path.
+        "qa_reports/qa_reports/trace.json": b"{}\n" * (manager._READ_AHEAD_MAX_FILE_BYTES // 2),
+    }
+    for arcname, payload in files.items():
+        path = root / arcname.split("/", 1)[1]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(payload)
+
+    session = _Session()
+    telemetry = ExportStage(StageContext(session, run)).execute()
+
+    bundle_key = f"exports/{run.id}/bundle.zip"
+    manifest_key = f"exports/{run.id}/manifest.json"
+    bundle = uploads[bundle_key]
+    assert telemetry["bundle"]["size_bytes"] == len(bundle)
+    assert telemetry["bundle"]["sha256"] == hashlib.sha256(bundle).hexdigest()
+
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        assert archive.testzip() is None
+        members = {info.filename: info for info in archive.infolist()}
+        assert set(members) == set(files) | {"manifest.json", "README_MAP.md"}
+        for arcname, payload in files.items():
+            assert archive.read(arcname) == payload
+            expected_type = (
+                zipfile.ZIP_STORED
+                if arcname.endswith((".png", ".jpg"))
+                else zipfile.ZIP_DEFLATED
+            )
+            assert members[arcname].compress_type == expected_type, arcname
+        embedded = orjson.loads(archive.read("manifest.json"))
+
+    # The zip cannot carry its own digest; only the uploaded manifest records it.
+    assert embedded["bundle"] == {"storage_key": bundle_key}
+    uploaded_manifest = orjson.loads(uploads[manifest_key])
+    assert uploaded_manifest["bundle"] == {
+        "storage_key": bundle_key,
+        "size_bytes": len(bundle),
+        "sha256": hashlib.sha256(bundle).hexdigest(),
+    }
+    assert {row["asset_type"] for row in session.rows} == {"manifest", "export_bundle"}
+
+
+def test_bundle_bytes_are_fixed_for_one_generated_at(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Rebuilding with the same manifest and generated_at gives the same bytes;
+    # a new export records a new generated_at, so only this much is promised.
+    monkeypatch.chdir(tmp_path)
+    image = tmp_path / "outputs" / "images" / "hero.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"png" * 100)
+    stage = ExportStage(StageContext(_Session(), _Run()))
+    assets = [("images", item) for item in stage._gather_images(Path("outputs"))]
+    generated_at = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+    digests = set()
+    for _ in range(2):
+        bundle_file, size, digest = stage._build_bundle_file(
+            assets,
+            b"{}",
+            "readme",
+            Path("outputs"),
+            tmp_path,
+            generated_at,
+        )
+        with bundle_file:
+            assert hashlib.sha256(bundle_file.read()).hexdigest() == digest
+        digests.add(digest)
+    assert len(digests) == 1
@@ -27,6 +27,7 @@ export interface Run {
 
 export interface RunListResponse {
   runs: Run[];
+  next_cursor?: string | null;
 }
 
 export interface AssetRecord {
@@ -41,6 +42,7 @@ export interface AssetRecord {
 
 export interface AssetListResponse {
   assets: AssetRecord[];
+  next_cursor?: string | null;
 }
 
 async function request<T>(path: string, options: RequestOptions = {}): Promise<T> {
@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import csv
-import json
 import re
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from itertools import cycle
+from functools import cached_property, lru_cache, partial
+from itertools import chain, cycle
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import orjson
 
 from outputs.csv import write_records
 from shared.stages.base import BaseStage
@@ -115,47 +119,86 @@ DEFAULT_MOTIVATIONS: Dict[str, List[str]] = {
     ],
 }
 
+_TOKEN_STRIP_RE = re.compile(r"[^A-Za-z0-9']")
+_WS_RE = re.compile(r"\s+")
+_BLOCKER_SPLIT_RE = re.compile(r"[,/·]| and ")
+
+# Checked in order: when a phrase mentions several blockers, the earliest
+# group wins regardless of where its keyword appears in the text.
+_BLOCKER_KEYWORD_GROUPS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("price", ("price", "cost", "$")),
+    ("durability", ("durab", "wear", "last")),
+    ("scam/legitimacy", ("scam", "legit", "trust", "fraud")),
+    ("fit/dimension", ("fit", "size", "dimension", "space")),
+    ("delivery", ("ship", "deliver", "arrival", "timeline")),
+    ("style mismatch", ("style", "match", "look", "aesthetic")),
+    ("returns friction", ("return", "refund", "exchange")),
+    ("commitment fear", ("commit", "long", "contract", "subscription")),
+    ("out-of-stock", ("stock", "sold", "backorder", "waitlist")),
+]
+_BLOCKER_KEYWORD_RANK: Dict[str, int] = {
+    keyword: rank
+    for rank, (_, keywords) in enumerate(_BLOCKER_KEYWORD_GROUPS)
+    for keyword in keywords
+}
+# A zero-width lookahead reports a keyword at every offset, so overlapping
+# keywords ("shiprice") are all seen in a single pass over the text.
+_BLOCKER_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _BLOCKER_KEYWORD_RANK) + "))"
+)
+
+_CTA_TONE_RE = re.compile(r"(playful)|(bold|confident)|(calm|soothing)")
+_CTA_TONES: Dict[int, str] = {
+    1: "Playful invitation",
+    2: "Confident nudge",
+    3: "Calming reassurance",
+}
+
 
+@lru_cache(maxsize=512)
 def _short_phrase(text: str, *, max_words: int = 3, default: str = "Creator") -> str:
-    tokens = [re.sub(r"[^A-Za-z0-9']", "", token) for token in text.split()]
+    tokens = [_TOKEN_STRIP_RE.sub("", token) for token in text.split()]
     clean = [token for token in tokens if token]
     if not clean:
         return default
     return " ".join(clean[:max_words])
 
 
+@lru_cache(maxsize=512)
 def _canonical_blocker(raw: str) -> Optional[str]:
     text = raw.lower()
     if not text:
         return None
-    if "price" in text or "cost" in text or "$" in text:
-        return "price"
-    if "durab" in text or "wear" in text or "last" in text:
-        return "durability"
-    if "scam" in text or "legit" in text or "trust" in text or "fraud" in text:
-        return "scam/legitimacy"
-    if "fit" in text or "size" in text or "dimension" in text or "space" in text:
-        return "fit/dimension"
-    if "ship" in text or "deliver" in text or "arrival" in text or "timeline" in text:
-        return "delivery"
-    if "style" in text or "match" in text or "look" in text or "aesthetic" in text:
-        return "style mismatch"
-    if "return" in text or "refund" in text or "exchange" in text:
-        return "returns friction"
-    if "commit" in text or "long" in text or "contract" in text or "subscription" in text:
-        return "commitment fear"
-    if "stock" in text or "sold" in text or "backorder" in text or "waitlist" in text:
-        return "out-of-stock"
-    return None
+    best: Optional[int] = None
+    for match in _BLOCKER_KEYWORD_RE.finditer(text):
+        rank = _BLOCKER_KEYWORD_RANK[match.group(1)]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return _BLOCKER_KEYWORD_GROUPS[best][0] if best is not None else None
 
 
 def _human_blocker_label(blocker: str) -> str:
-    return BLOCKER_LABELS.get(blocker, blocker.title())
+    label = BLOCKER_LABELS.get(blocker)
+    return label if label is not None else blocker.title()
 
 
 def _join_blockers(blockers: Sequence[str]) -> str:
-    humanised = [_human_blocker_label(blocker) for blocker in blockers]
-    return " · ".join(dict.fromkeys(humanised))
+    return _join_blocker_labels(tuple(blockers))
+
+
+# Blocker combinations come from a nine-word vocabulary, so the cache stays tiny.
+@lru_cache(maxsize=None)
+def _join_blocker_labels(blockers: Tuple[str, ...]) -> str:
+    seen: set[str] = set()
+    humanised: List[str] = []
+    for blocker in blockers:
+        label = _human_blocker_label(blocker)
+        if label not in seen:
+            seen.add(label)
+            humanised.append(label)
+    return " · ".join(humanised)
 
 
 def _sanitize_headline(headline: str) -> str:
@@ -169,7 +212,7 @@ def _sanitize_headline(headline: str) -> str:
 
 
 def _sanitize_sentence(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 
 def _coerce_bool(value: Any) -> Optional[bool]:
@@ -188,12 +231,88 @@ def _coerce_bool(value: Any) -> Optional[bool]:
     return None
 
 
-def _load_csv_rows(path: Path) -> List[Dict[str, str]]:
+# Synonym keys for each segment field, in lookup order; the first non-empty
+# value wins.
+_AUDIENCE_FIELD_KEYS: Dict[str, Tuple[str, ...]] = {
+    "identifier": ("#", "Id", "id", "identifier"),
+    "name": ("Audience Name", "name"),
+    "persona": ("Who They Are", "persona"),
+    "motivation": ("Primary Motivation", "motivation"),
+    "blockers": ("Top 2 Blockers", "blockers"),
+    "angle": ("Message Angle", "angle"),
+    "proof": ("Proof/Offer", "proof"),
+}
+
+
+def _audience_columns(header: Sequence[str]) -> Callable[[Sequence[str]], Tuple[Optional[str], ...]]:
+    """Resolve each segment field's synonym columns in ``header`` once per CSV.
+
+    The returned reader maps a row to its field values in
+    ``_AUDIENCE_FIELD_KEYS`` order.  Rows must be padded to ``len(header)``
+    cells plus one trailing blank, which stands in for fields the header lacks.
+    """
+
+    # Like DictReader, a repeated header name maps to its last column.
+    positions = {name: index for index, name in enumerate(header)}
+    indices = tuple(
+        tuple(positions[key] for key in keys if key in positions)
+        for keys in _AUDIENCE_FIELD_KEYS.values()
+    )
+    if all(len(field_indices) <= 1 for field_indices in indices):
+        # The usual case: at most one column per field, read in a single call.
+        return itemgetter(*(field_indices[0] if field_indices else -1 for field_indices in indices))
+    return partial(_column_values, indices=indices)
+
+
+def _column_values(row: Sequence[str], indices: Tuple[Tuple[int, ...], ...]) -> Tuple[Optional[str], ...]:
+    resolved: List[Optional[str]] = []
+    for field_indices in indices:
+        for index in field_indices:
+            if row[index]:
+                resolved.append(row[index])
+                break
+        else:
+            resolved.append(None)
+    return tuple(resolved)
+
+
+def _iter_csv_rows(path: Path) -> Iterator[Tuple[Optional[str], ...]]:
+    """Yield the segment field values of each non-blank CSV row.
+
+    Rows become flat tuples of strings rather than dicts or lists; the
+    collector can untrack those, so holding every row stays cheap.
+    """
+
     if not path.exists():
-        return []
+        return
     with path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return [dict(row) for row in reader]
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = _audience_columns(header)
+        # Blank padding reads like a missing DictReader cell to the lookups.
+        width = len(header)
+        for values in reader:
+            if not values:
+                continue
+            missing = width - len(values)
+            if missing > 0:
+                values.extend([""] * missing)
+            values.append("")
+            yield columns(values)
+
+
+def _row_value(row: Mapping[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = row.get(key)
+        if value:
+            return value
+    return None
+
+
+def _row_columns(row: Mapping[str, Any]) -> Tuple[Any, ...]:
+    return tuple(_row_value(row, keys) for keys in _AUDIENCE_FIELD_KEYS.values())
 
 
 @dataclass
@@ -206,20 +325,50 @@ class AudienceSegment:
     message_angle: str
     proof: str
 
+    @staticmethod
+    def _identity(identifier: Any, name: Any) -> Tuple[str, str]:
+        identifier = str(identifier or "")
+        return identifier, name or identifier or "Audience"
+
+    @staticmethod
+    def compute_fit_label(row: Mapping[str, Any]) -> str:
+        """Return the ``fit_label`` that :meth:`from_row` would produce for ``row``."""
+
+        return AudienceSegment.compute_column_fit_label(_row_columns(row))
+
+    @staticmethod
+    def compute_column_fit_label(columns: Sequence[Any]) -> str:
+        """Return the ``fit_label`` that :meth:`from_columns` would produce."""
+
+        # Identifier and name lead _AUDIENCE_FIELD_KEYS.
+        identifier, name = AudienceSegment._identity(columns[0], columns[1])
+        identifier = identifier or _short_phrase(name, max_words=2)
+        return f"{identifier.strip()} - {_short_phrase(name, max_words=3, default='Audience')}"
+
     @classmethod
-    def from_row(cls, row: Mapping[str, str]) -> "AudienceSegment":
-        identifier = str(row.get("#") or row.get("Id") or row.get("id") or row.get("identifier") or "")
-        name = row.get("Audience Name") or row.get("name") or identifier or "Audience"
-        persona = row.get("Who They Are") or row.get("persona") or name
-        motivation = row.get("Primary Motivation") or row.get("motivation") or "stay inspired"
-        blockers_text = row.get("Top 2 Blockers") or row.get("blockers") or ""
-        angle = row.get("Message Angle") or row.get("angle") or "Value-first reassurance"
-        proof = row.get("Proof/Offer") or row.get("proof") or "Customer stories prove staying power"
+    def from_row(cls, row: Mapping[str, Any]) -> "AudienceSegment":
+        return cls.from_columns(_row_columns(row))
+
+    @classmethod
+    def from_columns(cls, columns: Sequence[Any]) -> "AudienceSegment":
+        """Build a segment from field values in ``_AUDIENCE_FIELD_KEYS`` order.
+
+        Blank or missing values fall back to the same defaults as :meth:`from_row`.
+        """
+
+        identifier, name, persona, motivation, blockers_text, angle, proof = columns
+        identifier, name = cls._identity(identifier, name)
+        persona = persona or name
+        motivation = motivation or "stay inspired"
+        blockers_text = blockers_text or ""
+        angle = angle or "Value-first reassurance"
+        proof = proof or "Customer stories prove staying power"
         blockers = []
-        for token in re.split(r"[,/·]| and ", blockers_text):
-            canon = _canonical_blocker(token.strip())
-            if canon:
-                blockers.append(canon)
+        if blockers_text.strip():
+            for token in _BLOCKER_SPLIT_RE.split(blockers_text):
+                canon = _canonical_blocker(token.strip())
+                if canon:
+                    blockers.append(canon)
         if not blockers:
             blockers = ["price"]
         identifier = identifier or _short_phrase(name, max_words=2)
@@ -233,15 +382,15 @@ class AudienceSegment:
             proof=_sanitize_sentence(proof),
         )
 
-    @property
+    @cached_property
     def fit_label(self) -> str:
         return f"{self.identifier} - {self.short_name}"
 
-    @property
+    @cached_property
     def short_name(self) -> str:
         return _short_phrase(self.name, max_words=3, default="Audience")
 
-    @property
+    @cached_property
     def descriptor(self) -> str:
         return _sanitize_sentence(self.persona or self.name)
 
@@ -277,7 +426,7 @@ class ProcessArtifacts:
         for blocker in data.get("blockers", []) or []:
             if isinstance(blocker, Mapping):
                 name = blocker.get("blocker") or blocker.get("name") or ""
-                canon = _canonical_blocker(str(name))
+                canon = _canonical_blocker(str(name).strip())
                 if canon:
                     blocker_messages[canon] = _sanitize_sentence(
                         blocker.get("counter")
@@ -330,16 +479,14 @@ class ProcessArtifacts:
             values = ["Feel confident choosing better"]
         return values
 
-    @property
+    @cached_property
     def cta_tone(self) -> str:
-        voice = self.brand_voice.lower()
-        if "playful" in voice:
-            return "Playful invitation"
-        if "bold" in voice or "confident" in voice:
-            return "Confident nudge"
-        if "calm" in voice or "soothing" in voice:
-            return "Calming reassurance"
-        return "Assured guidance"
+        # Groups are ranked, so a voice naming several tones keeps the
+        # highest-ranked one wherever it appears.
+        ranks = [match.lastindex for match in _CTA_TONE_RE.finditer(self.brand_voice.lower())]
+        if not ranks:
+            return "Assured guidance"
+        return _CTA_TONES[min(ranks)]
 
 
 @dataclass
@@ -557,6 +704,31 @@ ANGLE_TEMPLATES: Dict[str, List[str]] = {
 }
 
 
+# Field names each template references, parsed once so rendering only
+# resolves what the template actually uses.
+_TEMPLATE_FIELDS: Dict[str, FrozenSet[str]] = {
+    template: frozenset(
+        field_name for _, field_name, _, _ in Formatter().parse(template) if field_name
+    )
+    for templates in (HEADLINE_TEMPLATES, VISUAL_TEMPLATES, ANGLE_TEMPLATES)
+    for bucket_templates in templates.values()
+    for template in bucket_templates
+}
+_SHOCK_HEADLINES = frozenset(HEADLINE_TEMPLATES.get("Shock", []))
+
+
+class _TemplateContext(dict):
+    """Template fields that derive ``<name>_lower`` variants on first use."""
+
+    def __missing__(self, key: str) -> str:
+        base, marker, tail = key.rpartition("_lower")
+        if marker and not tail and base in self:
+            value = self[base].lower()
+            self[key] = value
+            return value
+        raise KeyError(key)
+
+
 class CreativeStage(BaseStage):
     name = "creatives"
 
@@ -615,7 +787,7 @@ class CreativeStage(BaseStage):
             },
             "selection_hints": hints,
         }
-        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        manifest_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
         telemetry: Dict[str, Any] = {
             "concepts_generated": len(concepts),
@@ -632,35 +804,28 @@ class CreativeStage(BaseStage):
     def _load_audiences(self, run) -> List[AudienceSegment]:
         telemetry = run.telemetry or {}
         audience_data = telemetry.get("audiences", {}) if isinstance(telemetry, Mapping) else {}
-        records: List[AudienceSegment] = []
+        rows: List[Iterable[Any]] = []
+        csv_paths: List[Path] = []
 
         if isinstance(audience_data, Mapping):
-            for record in audience_data.get("records", []) or []:
-                if isinstance(record, Mapping):
-                    records.append(AudienceSegment.from_row(record))
-            for record in audience_data.get("rows", []) or []:
-                if isinstance(record, Mapping):
-                    records.append(AudienceSegment.from_row(record))
+            rows.append(audience_data.get("records", []) or [])
+            rows.append(audience_data.get("rows", []) or [])
             csv_hint = audience_data.get("csv_path") or audience_data.get("path")
             if csv_hint:
-                records.extend(self._load_audience_csv(Path(csv_hint)))
+                csv_paths.append(Path(csv_hint))
 
-        default_csv = Path("outputs/audiences/audiences_master.csv")
-        records.extend(self._load_audience_csv(default_csv))
+        csv_paths.append(Path("outputs/audiences/audiences_master.csv"))
 
-        if not records:
-            records = self._default_audiences()
-
-        unique: Dict[str, AudienceSegment] = {}
-        for segment in records:
-            unique[segment.fit_label] = segment
-        return list(unique.values())
-
-    def _load_audience_csv(self, path: Path) -> List[AudienceSegment]:
-        segments: List[AudienceSegment] = []
-        for row in _load_csv_rows(path):
-            segments.append(AudienceSegment.from_row(row))
-        return segments
+        # A later row replaces an earlier one with the same fit label but keeps
+        # its position, so only the surviving rows are parsed into segments.
+        columns = chain(
+            (_row_columns(row) for row in chain.from_iterable(rows) if isinstance(row, Mapping)),
+            chain.from_iterable(_iter_csv_rows(path) for path in csv_paths),
+        )
+        unique_rows = {AudienceSegment.compute_column_fit_label(values): values for values in columns}
+        if not unique_rows:
+            return self._default_audiences()
+        return [AudienceSegment.from_columns(values) for values in unique_rows.values()]
 
     def _default_audiences(self) -> List[AudienceSegment]:
         defaults = [
@@ -776,6 +941,17 @@ class CreativeStage(BaseStage):
                 audiences_by_blocker[blocker].append(audience)
         fallback_audience_cycle = cycle(audiences)
 
+        # Audience and blocker fields are fixed for the whole run; derive them
+        # (and their lowercase variants) once rather than once per concept.
+        audience_fields = {audience.fit_label: self._audience_fields(audience) for audience in audiences}
+        blocker_fields = {
+            blocker: self._blocker_fields(
+                blocker,
+                artifacts.blocker_messages.get(blocker, DEFAULT_BLOCKER_MESSAGES[blocker]),
+            )
+            for blocker in REQUIRED_BLOCKERS
+        }
+
         blocker_sequence: List[str] = []
         blocker_iter = cycle(REQUIRED_BLOCKERS)
         total_required = len(CREATIVE_BUCKETS) * 10
@@ -804,12 +980,11 @@ class CreativeStage(BaseStage):
             )
 
             context = self._build_context(
-                audience=audience,
+                audience_fields=audience_fields[audience.fit_label],
+                blocker_fields=blocker_fields[blocker],
                 product_keyword=product_keyword,
                 proof_point=proof_point,
-                blocker=blocker,
                 motivation_point=motivation_point,
-                blocker_resolution=artifacts.blocker_messages.get(blocker, DEFAULT_BLOCKER_MESSAGES[blocker]),
             )
 
             base_headline = self._format_template(HEADLINE_TEMPLATES[bucket], idx % 10, context)
@@ -902,42 +1077,46 @@ class CreativeStage(BaseStage):
             plan.extend([bucket] * 10)
         return plan
 
-    def _build_context(
-        self,
-        *,
-        audience: AudienceSegment,
-        product_keyword: str,
-        proof_point: str,
-        blocker: str,
-        motivation_point: str,
-        blocker_resolution: str,
-    ) -> Dict[str, str]:
+    def _audience_fields(self, audience: AudienceSegment) -> Dict[str, str]:
         audience_phrase = _short_phrase(audience.name, max_words=3, default="Audience")
-        product_phrase = _short_phrase(product_keyword, max_words=3, default="Flagship")
-        blocker_alias = BLOCKER_ALIASES.get(blocker, blocker)
-        context = {
+        return {
             "audience_phrase": audience_phrase,
             "audience_phrase_lower": audience_phrase.lower(),
             "audience_descriptor": audience.descriptor,
             "audience_descriptor_lower": audience.descriptor.lower(),
-            "product_phrase": product_phrase,
-            "product_phrase_lower": product_phrase.lower(),
-            "proof_phrase": proof_point,
-            "proof_phrase_lower": proof_point.lower(),
-            "motivation_phrase": motivation_point,
-            "motivation_phrase_lower": motivation_point.lower(),
+        }
+
+    def _blocker_fields(self, blocker: str, blocker_resolution: str) -> Dict[str, str]:
+        blocker_alias = BLOCKER_ALIASES.get(blocker, blocker)
+        return {
             "blocker_alias": blocker_alias,
             "blocker_alias_lower": blocker_alias.lower(),
             "blocker_resolution": blocker_resolution,
             "blocker_resolution_lower": blocker_resolution.lower(),
-            "market_signal": "Trusted craft in a noisy category",
         }
-        return context
+
+    def _build_context(
+        self,
+        *,
+        audience_fields: Mapping[str, str],
+        blocker_fields: Mapping[str, str],
+        product_keyword: str,
+        proof_point: str,
+        motivation_point: str,
+    ) -> Dict[str, str]:
+        return _TemplateContext(
+            audience_fields,
+            **blocker_fields,
+            product_phrase=_short_phrase(product_keyword, max_words=3, default="Flagship"),
+            proof_phrase=proof_point,
+            motivation_phrase=motivation_point,
+            market_signal="Trusted craft in a noisy category",
+        )
 
     def _format_template(self, templates: Sequence[str], index: int, context: Mapping[str, str]) -> str:
         template = templates[index % len(templates)]
-        formatted = template.format(**context)
-        if template in HEADLINE_TEMPLATES.get("Shock", []):
+        formatted = template.format_map({name: context[name] for name in _TEMPLATE_FIELDS[template]})
+        if template in _SHOCK_HEADLINES:
             formatted = _sanitize_headline(formatted)
         return formatted
 
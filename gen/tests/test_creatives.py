@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import csv
+import random
+from pathlib import Path
+
+import pytest
+
+from gen.creatives import (
+    ANGLE_TEMPLATES,
+    BLOCKER_ALIASES,
+    CREATIVE_BUCKETS,
+    DEFAULT_BLOCKER_MESSAGES,
+    HEADLINE_TEMPLATES,
+    REQUIRED_BLOCKERS,
+    VISUAL_TEMPLATES,
+    AudienceSegment,
+    CreativeStage,
+    ProcessArtifacts,
+    _BLOCKER_KEYWORD_GROUPS,
+    _TEMPLATE_FIELDS,
+    _canonical_blocker,
+    _iter_csv_rows,
+    _short_phrase,
+)
+
+
+class _Run:
+    def __init__(self, telemetry: dict) -> None:
+        self.telemetry = telemetry
+
+
+def _write_csv(path: Path, header: list[str], rows: list[list[str]]) -> Path:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def test_csv_columns_match_dict_rows(tmp_path: Path) -> None:
+    header = ["#", "Audience Name", "name", "Top 2 Blockers", "Proof/Offer", "notes", "#"]
+    rows = [
+        ["A1", "Design renters", "ignored", "Price / Delivery", "Lofts", "x", ""],
+        ["", "", "Fallback name", "", "", "", "B2"],
+        ["C3", "Short row"],
+        [],
+        ["D4", "Long row", "", "style", "Proof", "x", "", "extra", "cells"],
+    ]
+    path = _write_csv(tmp_path / "audiences.csv", header, rows)
+
+    with path.open(newline="", encoding="utf-8") as handle:
+        expected = [AudienceSegment.from_row(row) for row in csv.DictReader(handle)]
+    actual = [AudienceSegment.from_columns(columns) for columns in _iter_csv_rows(path)]
+
+    assert actual == expected
+    # A blank first synonym falls through to the next one, and repeated
+    # headers resolve to their last column, as with DictReader.
+    assert actual[1].identifier == "B2"
+    assert actual[1].name == "Fallback name"
+    assert [segment.fit_label for segment in actual] == [
+        AudienceSegment.compute_column_fit_label(columns) for columns in _iter_csv_rows(path)
+    ]
+
+
+def test_load_audiences_keeps_last_duplicate_in_first_position(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # The stage also reads outputs/audiences/audiences_master.csv from the cwd.
+    monkeypatch.chdir(tmp_path)
+    path = _write_csv(
+        tmp_path / "audiences.csv",
+        ["#", "Audience Name", "Top 2 Blockers"],
+        [["A1", "One", "delivery"], ["A3", "Three", "style"]],
+    )
+    run = _Run(
+        {
+            "audiences": {
+                "records": [
+                    {"#": "A1", "Audience Name": "One", "Top 2 Blockers": "price"},
+                    {"#": "A2", "Audience Name": "Two"},
+                ],
+                "rows": ["not a mapping"],
+                "csv_path": str(path),
+            }
+        }
+    )
+
+    audiences = CreativeStage.__new__(CreativeStage)._load_audiences(run)
+
+    assert [(segment.fit_label, segment.blockers) for segment in audiences] == [
+        ("A1 - One", ["delivery"]),
+        ("A2 - Two", ["price"]),
+        ("A3 - Three", ["style mismatch"]),
+    ]
+
+
+def _ordered_blocker_scan(raw: str) -> str | None:
+    # The precedence _canonical_blocker must keep: first group with any keyword.
+    text = raw.lower()
+    return next(
+        (name for name, keywords in _BLOCKER_KEYWORD_GROUPS if any(k in text for k in keywords)),
+        None,
+    )
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("Price", "price"),
+        ("Long delivery", "delivery"),
+        ("Sold out", "out-of-stock"),
+        ("Trust / Style", "scam/legitimacy"),
+        ("shiprice", "price"),
+        ("Looks lasting", "durability"),
+        ("", None),
+        ("Nothing relevant", None),
+    ],
+)
+def test_canonical_blocker_precedence(raw: str, expected: str | None) -> None:
+    assert _canonical_blocker(raw) == expected
+
+
+def test_canonical_blocker_matches_ordered_scan() -> None:
+    rng = random.Random(7)
+    fragments = [k for _, keywords in _BLOCKER_KEYWORD_GROUPS for k in keywords]
+    fragments += ["a", "x", " ", "/", "S", "pri", "ce", "ong"]
+    for _ in range(2000):
+        raw = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 6)))
+        assert _canonical_blocker(raw) == _ordered_blocker_scan(raw), raw
+
+
+def _stage() -> CreativeStage:
+    return CreativeStage.__new__(CreativeStage)
+
+
+def test_precomputed_context_covers_every_template_field() -> None:
+    stage = _stage()
+    templates = [
+        template
+        for table in (HEADLINE_TEMPLATES, VISUAL_TEMPLATES, ANGLE_TEMPLATES)
+        for bucket_templates in table.values()
+        for template in bucket_templates
+    ]
+    for audience in stage._default_audiences():
+        for blocker in REQUIRED_BLOCKERS:
+            context = stage._build_context(
+                audience_fields=stage._audience_fields(audience),
+                blocker_fields=stage._blocker_fields(blocker, DEFAULT_BLOCKER_MESSAGES[blocker]),
+                product_keyword="walnut credenza",
+                proof_point="Five-year warranty",
+                motivation_point=audience.motivation or "Buy once",
+            )
+            for template in templates:
+                for name in _TEMPLATE_FIELDS[template]:
+                    value = context[name]
+                    if name.endswith("_lower"):
+                        assert value == context[name[: -len("_lower")]].lower(), name
+            assert context["audience_phrase"] == _short_phrase(
+                audience.name, max_words=3, default="Audience"
+            )
+            assert context["blocker_alias"] == BLOCKER_ALIASES.get(blocker, blocker)
+
+
+def test_build_concepts_renders_each_concepts_own_fields() -> None:
+    stage = _stage()
+    audiences = stage._default_audiences()
+    by_fit = {audience.fit_label: audience for audience in audiences}
+    artifacts = ProcessArtifacts.from_telemetry({})
+
+    concepts, *_ = stage._build_concepts(
+        audiences=audiences, artifacts=artifacts, promo_allowed=False
+    )
+
+    assert len(concepts) == len(CREATIVE_BUCKETS) * 10
+    assert len({concept.headline.lower() for concept in concepts}) == len(concepts)
+    for concept in concepts:
+        blocker = concept.metadata["blockers"][0]
+        audience = by_fit[concept.audience_fit]
+        assert concept.audience_id == audience.identifier
+        assert concept.metadata["audience_name"] == audience.name
+        if any(blocker in segment.blockers for segment in audiences):
+            assert blocker in audience.blockers
+        # The first Shock headline opens with the audience phrase.
+        if concept.bucket == "Shock" and concept.index == 1:
+            phrase = _short_phrase(audience.name, max_words=3, default="Audience")
+            assert concept.headline.lower().startswith(phrase.lower())
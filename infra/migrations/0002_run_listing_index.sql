@@ -0,0 +1,8 @@
+-- Composite index backing the owner-scoped, newest-first run listing.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_owner_created
+    ON pipeline_runs(owner_id, created_at DESC, id DESC);
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- Composite index backing owner-scoped single-run lookups.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_owner_id
+    ON pipeline_runs(owner_id, id);
+
+COMMIT;
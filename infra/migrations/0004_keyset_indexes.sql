@@ -0,0 +1,11 @@
+-- Composite indexes backing the keyset-paginated log and asset listings.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_run_logs_run_created
+    ON run_logs(run_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_asset_records_run_created
+    ON asset_records(run_id, created_at DESC, id DESC);
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- Persist each stage's pipeline position so runs load their stages pre-sorted.
+
+BEGIN;
+
+-- No server default: the ORM fills sort_index on every insert.
+ALTER TABLE stage_states ADD COLUMN IF NOT EXISTS sort_index INTEGER;
+
+-- Mirrors shared.pipeline.stage_sort_index: the stage's position in
+-- PIPELINE_ORDER, with unknown stages placed after the last known one.
+WITH pipeline(stage_order) AS (
+    SELECT ARRAY['scrape', 'process', 'audiences', 'creatives', 'images', 'qa', 'export']::TEXT[]
+)
+UPDATE stage_states
+SET sort_index = COALESCE(
+    array_position(pipeline.stage_order, stage_states.name::TEXT) - 1,
+    cardinality(pipeline.stage_order)
+)
+FROM pipeline;
+
+ALTER TABLE stage_states ALTER COLUMN sort_index SET NOT NULL;
+
+COMMIT;
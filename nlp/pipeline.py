@@ -237,11 +237,11 @@ class ProcessStage(BaseStage):
             return self._load_from_path(storage_key)
 
         try:
-            from shared.storage import client, settings
+            from shared.storage import get_client, settings
 
             bucket = parsed.netloc or settings.minio_bucket
             object_name = parsed.path.lstrip("/")
-            response = client.get_object(bucket, object_name)
+            response = get_client().get_object(bucket, object_name)
             try:
                 payload = response.read()
             finally:
@@ -13,10 +13,23 @@ from .config import get_settings
 
 settings = get_settings()
 
-async_engine = create_async_engine(settings.database_url, echo=False, future=True)
+async_engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
 AsyncSessionFactory = async_sessionmaker(async_engine, expire_on_commit=False)
 
-sync_engine = create_engine(settings.sync_database_url, future=True)
+sync_engine = create_engine(
+    settings.sync_database_url,
+    future=True,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
 SyncSessionFactory = sessionmaker(bind=sync_engine, expire_on_commit=False, future=True)
 
 
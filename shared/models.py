@@ -5,12 +5,13 @@ import enum
 from datetime import UTC, datetime
 from typing import Dict
 
-from sqlalchemy import JSON, Column, DateTime, Enum, Float, ForeignKey, String, Text
+from sqlalchemy import JSON, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, relationship
 
 from .config import get_settings
+from .pipeline import stage_sort_index
 
 
 Base = declarative_base()
@@ -39,6 +40,12 @@ def _utcnow() -> datetime:
     return datetime.now(UTC)
 
 
+def _stage_sort_index(context) -> int:
+    """Default a stage's ``sort_index`` from its name."""
+
+    return stage_sort_index(context.get_current_parameters()["name"])
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -73,8 +80,18 @@ class PipelineRun(Base):
     created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("idx_pipeline_runs_owner_created", owner_id, created_at.desc(), id.desc()),
+        Index("idx_pipeline_runs_owner_id", owner_id, id),
+    )
+
     owner = relationship("User")
-    stages = relationship("StageState", back_populates="run", cascade="all, delete-orphan")
+    stages = relationship(
+        "StageState",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        order_by="[StageState.sort_index, StageState.name]",
+    )
     logs = relationship("RunLog", back_populates="run", cascade="all, delete-orphan")
 
 
@@ -84,6 +101,7 @@ class StageState(Base):
     id = Column(UUID(as_uuid=True), primary_key=True)
     run_id = Column(UUID(as_uuid=True), ForeignKey("pipeline_runs.id"), nullable=False)
     name = Column(String(64), nullable=False)
+    sort_index = Column(Integer, default=_stage_sort_index, nullable=False)
     status = Column(Enum(StageStatus), default=StageStatus.PENDING, nullable=False)
     started_at = Column(DateTime(timezone=True))
     finished_at = Column(DateTime(timezone=True))
@@ -91,6 +109,8 @@ class StageState(Base):
     budget_spent = Column(Float, default=0.0, nullable=False)
     notes = Column(Text, default="")
 
+    __table_args__ = (Index("idx_stage_states_run_stage", run_id, name, unique=True),)
+
     run = relationship("PipelineRun", back_populates="stages")
 
 
@@ -104,6 +124,8 @@ class RunLog(Base):
     message = Column(Text, nullable=False)
     data = Column("metadata", JSON, default=dict, nullable=False)
 
+    __table_args__ = (Index("idx_run_logs_run_created", run_id, created_at, id),)
+
     run = relationship("PipelineRun", back_populates="logs")
 
 
@@ -118,6 +140,10 @@ class AssetRecord(Base):
     extra = Column(JSON, default=dict, nullable=False)
     created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("idx_asset_records_run_created", run_id, created_at.desc(), id.desc()),
+    )
+
     run = relationship("PipelineRun")
 
 
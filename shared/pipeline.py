@@ -1,7 +1,7 @@
 """Utilities for orchestrating the scrape→process→audiences→creatives→images→qa→export pipeline."""
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List
 
 PIPELINE_ORDER: List[str] = [
     "scrape",
@@ -12,3 +12,11 @@ PIPELINE_ORDER: List[str] = [
     "qa",
     "export",
 ]
+
+_STAGE_INDEX: Dict[str, int] = {name: index for index, name in enumerate(PIPELINE_ORDER)}
+
+
+def stage_sort_index(stage_name: str) -> int:
+    """Return the position of ``stage_name`` in the pipeline; unknown stages sort last."""
+
+    return _STAGE_INDEX.get(stage_name, len(PIPELINE_ORDER))
@@ -1,12 +1,21 @@
 """Simple token-based authentication utilities."""
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
+import time
 import uuid
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from .config import DEFAULT_JWT_SECRET, get_settings
 from .models import SessionToken, User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -20,18 +29,142 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _signing_key() -> Optional[bytes]:
+    secret = get_settings().jwt_secret
+    if not secret or secret == DEFAULT_JWT_SECRET:
+        return None
+    return secret.encode("utf-8")
+
+
+def signing_enabled() -> bool:
+    """Whether a real ``jwt_secret`` is configured for signed session tokens."""
+
+    return _signing_key() is not None
+
+
+def _token_signature(key: bytes, payload: str) -> bytes:
+    return hmac.new(key, payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def sign_session_token(token_id: uuid.UUID, user_id: uuid.UUID, expires_at: int) -> str:
+    """Return a ``payload.signature`` token for the session row ``token_id``.
+
+    The row id makes every token unique, even for logins in the same second,
+    and lets verification check the session still exists by primary key.
+    """
+
+    key = _signing_key()
+    if key is None:
+        raise RuntimeError("Refusing to sign session tokens with the default jwt_secret")
+    raw = token_id.bytes + user_id.bytes + expires_at.to_bytes(8, "big")
+    payload = _b64encode(raw)
+    return f"{payload}.{_b64encode(_token_signature(key, payload))}"
+
+
+def verify_session_token(token: str) -> Optional[Tuple[uuid.UUID, uuid.UUID]]:
+    """Return ``(token_id, user_id)`` for a validly signed, unexpired token.
+
+    Returns ``None`` otherwise, including for every token while ``jwt_secret``
+    is the default.  Opaque UUID tokens also fail here; callers fall back to
+    :func:`get_user_by_token` for those.
+    """
+
+    key = _signing_key()
+    if key is None:
+        return None
+    payload, sep, signature = token.partition(".")
+    if not sep:
+        return None
+    try:
+        if not hmac.compare_digest(_b64decode(signature), _token_signature(key, payload)):
+            return None
+        raw = _b64decode(payload)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if len(raw) != 40 or int.from_bytes(raw[32:], "big") <= time.time():
+        return None
+    return uuid.UUID(bytes=raw[:16]), uuid.UUID(bytes=raw[16:32])
+
+
 def create_session_token(session: Session, user: User) -> SessionToken:
-    token = SessionToken(id=uuid.uuid4(), user=user, token=str(uuid.uuid4()))
+    token_id = uuid.uuid4()
+    if signing_enabled():
+        expires_at = int(time.time()) + get_settings().session_token_ttl_seconds
+        value = sign_session_token(token_id, user.id, expires_at)
+    else:
+        value = str(uuid.uuid4())
+    token = SessionToken(id=token_id, user=user, token=value)
     session.add(token)
     session.commit()
     session.refresh(token)
     return token
 
 
-def get_user_by_token(session: Session, token: str) -> Optional[User]:
-    return (
-        session.query(User)
+async def get_user_by_token(session: AsyncSession, token: str) -> Optional[User]:
+    result = await session.execute(
+        select(User)
+        .join(SessionToken, SessionToken.user_id == User.id)
+        .where(SessionToken.token == token)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_user_by_token_id(
+    session: AsyncSession, token_id: uuid.UUID, user_id: uuid.UUID
+) -> Optional[User]:
+    """Resolve a verified signed token, so deleted sessions and users are refused."""
+
+    result = await session.execute(
+        select(User)
         .join(SessionToken, SessionToken.user_id == User.id)
-        .filter(SessionToken.token == token)
-        .one_or_none()
+        .where(SessionToken.id == token_id, User.id == user_id)
     )
+    return result.scalar_one_or_none()
+
+
+class TokenUserCache:
+    """Bounded TTL cache mapping bearer tokens to the user they resolve to.
+
+    Keys are BLAKE2b digests so raw tokens never sit in process memory longer
+    than the request that carried them.  Entries hold only the identifying
+    columns; :meth:`get` returns a fresh transient :class:`User` each time so no
+    ORM instance is shared between sessions.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, uuid.UUID, str]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[User]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user_id, email = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return User(id=user_id, email=email)
+
+    def set(self, token: str, user: User) -> None:
+        key = self._key(token)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user.id, user.email)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> None:
+        self._entries.pop(self._key(token), None)
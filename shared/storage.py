@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 import io
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import BinaryIO, Optional
 
 from minio import Minio
@@ -12,23 +14,42 @@ from .config import get_settings
 
 
 settings = get_settings()
+_bucket_ready = False
+_bucket_lock = threading.Lock()
 
-client = Minio(
-    endpoint=settings.minio_endpoint,
-    access_key=settings.minio_access_key,
-    secret_key=settings.minio_secret_key,
-    secure=False,
-)
+
+@lru_cache()
+def get_client() -> Minio:
+    """Return the process-wide MinIO client.
+
+    The client owns the connection pool, so callers must reuse this instance
+    rather than constructing their own ``Minio``.
+    """
+
+    return Minio(
+        endpoint=settings.minio_endpoint,
+        access_key=settings.minio_access_key,
+        secret_key=settings.minio_secret_key,
+        secure=False,
+    )
 
 
 def ensure_bucket() -> None:
-    if not client.bucket_exists(settings.minio_bucket):
-        client.make_bucket(settings.minio_bucket)
+    global _bucket_ready
+    if _bucket_ready:
+        return
+    with _bucket_lock:
+        if _bucket_ready:
+            return
+        client = get_client()
+        if not client.bucket_exists(settings.minio_bucket):
+            client.make_bucket(settings.minio_bucket)
+        _bucket_ready = True
 
 
 def put_object(key: str, data: BinaryIO, length: int, content_type: str = "application/octet-stream") -> str:
     ensure_bucket()
-    client.put_object(settings.minio_bucket, key, data, length, content_type=content_type)
+    get_client().put_object(settings.minio_bucket, key, data, length, content_type=content_type)
     return f"s3://{settings.minio_bucket}/{key}"
 
 
@@ -58,7 +79,7 @@ def presign_get_object(key: str, ttl_seconds: Optional[int] = None) -> SignedURL
     ttl = ttl_seconds or settings.export_bundle_ttl_seconds
     ttl = max(ttl, 1)
     expires_delta = timedelta(seconds=ttl)
-    url = client.presigned_get_object(
+    url = get_client().presigned_get_object(
         settings.minio_bucket,
         key,
         expires=expires_delta,
@@ -75,20 +96,36 @@ def upload_bytes(
 ) -> SignedUpload:
     """Upload a payload to storage and return metadata with a presigned URL."""
 
+    return upload_fileobj(
+        key,
+        io.BytesIO(payload),
+        len(payload),
+        content_type=content_type,
+        ttl_seconds=ttl_seconds,
+    )
+
+
+def upload_fileobj(
+    key: str,
+    data: BinaryIO,
+    length: int,
+    content_type: str = "application/octet-stream",
+    ttl_seconds: Optional[int] = None,
+) -> SignedUpload:
+    """Stream ``length`` bytes from ``data`` to storage and presign the object."""
+
     ensure_bucket()
-    buffer = io.BytesIO(payload)
-    size = len(payload)
-    client.put_object(
+    get_client().put_object(
         settings.minio_bucket,
         key,
-        buffer,
-        size,
+        data,
+        length,
         content_type=content_type,
     )
     signed = presign_get_object(key, ttl_seconds=ttl_seconds)
     return SignedUpload(
         key=key,
-        size=size,
+        size=length,
         content_type=content_type,
         signed_url=signed.url,
         expires_at=signed.expires_at,